@@ -0,0 +1,54 @@
+"""
+Cold import time of qbsdk, measured in fresh interpreters, and whether the wallet dependencies were loaded.
+
+    python benchmarks/bench_import.py [count]
+"""
+import os
+import subprocess
+import sys
+
+# modules which must only be imported when a Wallet is used
+WALLET_MODULES = ('web3', 'eth_account', 'backoff', 'qbsdk.wallet')
+
+IMPORTS = {
+    'import qbsdk': 'import qbsdk',
+    'import qbsdk + Wallet': 'import qbsdk; qbsdk.Wallet'
+}
+
+_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, ','.join(name for name in {wallet_modules!r} if name in sys.modules))
+'''
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(statement: str) -> tuple:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (_ROOT, env.get('PYTHONPATH'))))
+    script = _SCRIPT.format(statement=statement, wallet_modules=WALLET_MODULES)
+    output = subprocess.run([sys.executable, '-c', script], env=env, check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout.split()
+    return float(output[0]), output[1].split(',') if len(output) > 1 else []
+
+
+def run(count: int = 5) -> list:
+    results = []
+    for name, statement in IMPORTS.items():
+        samples = [measure(statement) for _ in range(count)]
+        results.append({
+            'name': name,
+            'count': count,
+            'ms': min(map(lambda sample: sample[0], samples)) * 1e3,
+            'wallet_modules_loaded': samples[0][1]
+        })
+    return results
+
+
+if __name__ == '__main__':
+    for result in run(int(sys.argv[1]) if len(sys.argv) > 1 else 5):
+        print(f"{result['name']:<24} {result['ms']:8.1f} ms   wallet modules: "
+              f"{', '.join(result['wallet_modules_loaded']) or '-'}")
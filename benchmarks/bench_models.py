@@ -0,0 +1,99 @@
+"""
+Construction time and retained memory of the response models.
+
+    python benchmarks/bench_models.py [count]
+"""
+import sys
+import timeit
+import tracemalloc
+
+from qbsdk.api import Transaction, Block, Address
+
+
+def transaction_json(i: int) -> dict:
+    return {
+        'blockHash': '0x' + f'{i:064x}',
+        'blockNumber': 1000000 + i,
+        'chainId': 1,
+        'from': '0x87265a62c60247f862b9149423061b36b460f4bb',
+        'hash': '0x' + f'{i + 1:064x}',
+        'input': '0xa9059cbb' + '00' * 64,
+        'nonce': i,
+        'to': '0x' + f'{i:040x}',
+        'transactionIndex': 0,
+        'value': str(10 ** 18 + i),
+        'status': True,
+        'contract': '0x1111111111111111111111111111111111111111',
+        'timestamp': 1570000000 + i,
+        'confirms': 12,
+        'token': {
+            'contractAddress': '0x1111111111111111111111111111111111111111',
+            'decimals': 18,
+            'description': 'Loyalty token',
+            'name': 'Loyalty',
+            'rate': 1,
+            'symbol': 'LOY',
+            'totalSupply': 10 ** 27,
+            'tokenType': 'nowallet'
+        },
+        'state': 'processed'
+    }
+
+
+def block_json(i: int) -> dict:
+    return {
+        'extraData': '0x', 'hash': '0x' + f'{i:064x}', 'miner': '0x' + '00' * 20, 'number': i,
+        'parentHash': '0x' + f'{i:064x}', 'receiptsRoot': '0x' + '00' * 32, 'sha3Uncles': '0x' + '00' * 32,
+        'size': 600, 'stateRoot': '0x' + '00' * 32, 'timestamp': 1570000000 + i, 'transactions': [],
+        'transactionsRoot': '0x' + '00' * 32, 'chainId': 1
+    }
+
+
+def address_json(i: int) -> dict:
+    return {
+        'transactionCount': i,
+        'balances': {'private': {'LOY': {'balance': str(i), 'contractAddress': '0x' + '11' * 20}}}
+    }
+
+
+def measure(name: str, model, make_json, count: int) -> dict:
+    json_objects = [make_json(i) for i in range(count)]
+
+    construct_seconds = min(timeit.repeat(lambda: [model(json_object) for json_object in json_objects],
+                                          number=1, repeat=5))
+
+    tracemalloc.start()
+    objects = [model(json_object) for json_object in json_objects]
+    retained_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+
+    return {
+        'name': name,
+        'count': count,
+        'construct_us_per_object': construct_seconds / count * 1e6,
+        'retained_bytes_per_object': retained_bytes / count
+    }
+
+
+def read_hash_and_confirms(json_object: dict) -> Transaction:
+    transaction = Transaction.lazy(json_object)
+    transaction.hash, transaction.confirms
+    return transaction
+
+
+def run(count: int = 100000) -> list:
+    return [
+        measure('Transaction', Transaction, transaction_json, count),
+        measure('Transaction.lazy', Transaction.lazy, transaction_json, count),
+        measure('Transaction.lazy (hash, confirms read)', read_hash_and_confirms, transaction_json, count),
+        measure('Block', Block, block_json, count),
+        measure('Block.lazy', Block.lazy, block_json, count),
+        measure('Address', Address, address_json, count)
+    ]
+
+
+if __name__ == '__main__':
+    for result in run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000):
+        print(f"{result['name']:<40} {result['construct_us_per_object']:8.2f} us/object "
+              f"{result['retained_bytes_per_object']:8.0f} bytes/object")
@@ -0,0 +1,52 @@
+"""
+Client side overhead of a request: do_request through the Api's session (request preparation, transport adapter
+dispatch, JSON decoding) against the in-process simulator without latency, compared to the simulator handling the
+same request directly.
+
+    python benchmarks/bench_requests.py [count]
+"""
+import sys
+import timeit
+
+from qbsdk.api import do_request, API_VERSION
+from qbsdk.simulator import Simulator
+
+REQUESTS = (
+    ('GET /net', '/net', None),
+    ('GET /tokens', '/tokens', None),
+    ('GET /prices', '/prices', 'from')
+)
+
+
+def run(count: int = 2000) -> list:
+    simulator = Simulator()
+    token = simulator.add_token('BENCH')
+    api = simulator.api(api_key='bench')
+    headers = {'ApiVersion': API_VERSION}
+
+    results = []
+    for name, path, token_param in REQUESTS:
+        params = {token_param: token['contractAddress']} if token_param is not None else None
+        query = f'?{token_param}={token["contractAddress"]}' if token_param is not None else ''
+
+        def through_sdk():
+            do_request(api.api_host, 'GET', path, params=params, session=api._session)
+
+        def simulator_only():
+            simulator.handle('GET', f'{api.api_host}{path}{query}', headers, None)
+
+        sdk_seconds = min(timeit.repeat(through_sdk, number=count, repeat=3))
+        simulator_seconds = min(timeit.repeat(simulator_only, number=count, repeat=3))
+        results.append({
+            'name': name,
+            'count': count,
+            'us_per_request': sdk_seconds / count * 1e6,
+            'sdk_overhead_us_per_request': (sdk_seconds - simulator_seconds) / count * 1e6
+        })
+    return results
+
+
+if __name__ == '__main__':
+    for result in run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000):
+        print(f"{result['name']:<14} {result['us_per_request']:8.1f} us/request "
+              f"{result['sdk_overhead_us_per_request']:8.1f} us SDK overhead")
@@ -0,0 +1,64 @@
+"""
+End-to-end throughput of Wallet.send_transaction and Wallet.send_batch for both TransferStrategy values, against
+the in-process simulator without latency: nonce fetching, building, signing, posting and the simulator's
+signature verification.
+
+    python benchmarks/bench_send.py [count]
+"""
+import sys
+import time
+
+import eth_account
+
+from qbsdk.api import TokenType, TransactionType
+from qbsdk.simulator import Simulator
+from qbsdk.wallet import TransferStrategy, TxData, Wallet
+
+BATCH_SIZE = 25
+
+
+def setup_wallet(simulator: Simulator, token_type: TokenType, transfer_strategy: TransferStrategy) -> Wallet:
+    private_key = eth_account.Account.create().key.hex()
+    wallet = Wallet(private_key, 'BENCH', None, transfer_strategy)
+    simulator.add_token('BENCH', token_type, owner=wallet.checksum_address)
+    wallet.api = simulator.api(api_key='bench')
+    wallet.setup()
+    return wallet
+
+
+def measure(name: str, send, count: int, items_per_send: int = 1) -> dict:
+    started_at = time.perf_counter()
+    for i in range(count):
+        send(i)
+    seconds = time.perf_counter() - started_at
+    return {
+        'name': name,
+        'count': count,
+        'ms_per_send': seconds / count * 1e3,
+        'items_per_second': count * items_per_send / seconds
+    }
+
+
+def run(count: int = 50) -> list:
+    results = []
+    for transfer_strategy in (TransferStrategy.user, TransferStrategy.brand):
+        simulator = Simulator(api_key='bench')
+        wallet = setup_wallet(simulator, TokenType.wallet, transfer_strategy)
+        receiver = eth_account.Account.create().address
+        results.append(measure(
+            f'send_transaction ({transfer_strategy.value}, wallet token)',
+            lambda i: wallet.send_transaction(receiver, 1, tx_type=TransactionType.transfer), count))
+
+        simulator = Simulator(api_key='bench')
+        wallet = setup_wallet(simulator, TokenType.nowallet, transfer_strategy)
+        batch = [TxData(1, '0x' + f'{i + 1:064x}') for i in range(BATCH_SIZE)]
+        results.append(measure(
+            f'send_batch ({transfer_strategy.value}, {BATCH_SIZE} items)',
+            lambda i: wallet.send_batch(batch, TransactionType.earn), count, BATCH_SIZE))
+    return results
+
+
+if __name__ == '__main__':
+    for result in run(int(sys.argv[1]) if len(sys.argv) > 1 else 50):
+        print(f"{result['name']:<36} {result['ms_per_send']:8.2f} ms/send "
+              f"{result['items_per_second']:10.1f} items/s")
@@ -0,0 +1,58 @@
+"""
+Per-transaction cost of building a loyalty token transfer with web3's buildTransaction versus the
+TransactionBuilder the Wallet uses, and of signing it with the hex key string, as the Wallet did through
+`web3.eth.account.signTransaction`, versus the TransactionSigner the Wallet keeps after setup().
+
+    python benchmarks/bench_signing.py [count]
+"""
+import sys
+import timeit
+
+import eth_account
+from web3 import Web3
+
+import qbsdk.loyalty_token as loyalty_token
+from qbsdk.api import TokenType
+from qbsdk.builder import TransactionBuilder
+from qbsdk.signing import TransactionSigner
+
+CONTRACT_ADDRESS = Web3.toChecksumAddress('0x1111111111111111111111111111111111111111')
+RECEIVER_ADDRESS = Web3.toChecksumAddress('0x87265a62c60247f862b9149423061b36b460f4bb')
+
+
+def run(count: int = 200) -> list:
+    private_key = eth_account.Account.create().key.hex()
+    web3_connection = Web3()
+    signer = TransactionSigner(private_key)
+    builder = TransactionBuilder(TokenType.wallet, CONTRACT_ADDRESS, 1)
+    contract = web3_connection.eth.contract(abi=loyalty_token.abi, address=CONTRACT_ADDRESS)
+    raw_tx = builder.build(RECEIVER_ADDRESS, 10, 1)
+
+    def build_with_web3():
+        contract.functions.transfer(RECEIVER_ADDRESS, 10).buildTransaction(builder.tx_params(1))
+
+    def build_with_builder():
+        builder.build(RECEIVER_ADDRESS, 10, 1)
+
+    def sign_with_key_string():
+        web3_connection.eth.account.sign_transaction(raw_tx, private_key)
+
+    def sign_with_signer():
+        signer.sign(raw_tx)
+
+    operations = (
+        ('build with web3 buildTransaction', build_with_web3),
+        ('build with TransactionBuilder', build_with_builder),
+        ('sign with key string', sign_with_key_string),
+        ('sign with TransactionSigner', sign_with_signer)
+    )
+    results = []
+    for name, operation in operations:
+        seconds = min(timeit.repeat(operation, number=count, repeat=3))
+        results.append({'name': name, 'count': count, 'us_per_op': seconds / count * 1e6})
+    return results
+
+
+if __name__ == '__main__':
+    for result in run(int(sys.argv[1]) if len(sys.argv) > 1 else 200):
+        print(f"{result['name']:<34} {result['us_per_op']:10.1f} us")
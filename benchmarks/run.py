@@ -0,0 +1,80 @@
+"""
+Run the benchmark suite and write the results as JSON, to compare SDK versions:
+
+    python benchmarks/run.py [--only send,requests] [--quick] [--output results.json]
+
+Every benchmark module exposes `run(count) -> list` of result dicts. Everything runs offline, requests are
+answered by the in-process simulator.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+BENCHMARKS = ('import', 'requests', 'models', 'signing', 'send')
+
+# reduced counts for a fast smoke run
+QUICK_COUNTS = {
+    'import': 2,
+    'requests': 200,
+    'models': 10000,
+    'signing': 20,
+    'send': 10
+}
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=_DIRECTORY, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, universal_newlines=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(benchmarks=BENCHMARKS, quick: bool = False) -> dict:
+    sys.path.insert(0, os.path.dirname(_DIRECTORY))
+    sys.path.insert(0, _DIRECTORY)
+
+    results = {}
+    for benchmark in benchmarks:
+        module = importlib.import_module(f'bench_{benchmark}')
+        started_at = time.perf_counter()
+        results[benchmark] = module.run(QUICK_COUNTS[benchmark]) if quick else module.run()
+        print(f'{benchmark}: done in {time.perf_counter() - started_at:.1f}s', file=sys.stderr)
+
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'time': int(time.time()),
+        'results': results
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the qbsdk benchmarks.')
+    parser.add_argument('--only', help=f'comma separated subset of: {", ".join(BENCHMARKS)}')
+    parser.add_argument('--quick', action='store_true', help='use small counts, for a smoke run')
+    parser.add_argument('--output', help='file to write the JSON results to, instead of stdout')
+    args = parser.parse_args()
+
+    selected = args.only.split(',') if args.only else BENCHMARKS
+    unknown = [benchmark for benchmark in selected if benchmark not in BENCHMARKS]
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(unknown)}')
+
+    report = run(selected, quick=args.quick)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
@@ -10,24 +10,28 @@ api = qbsdk.Api(api_key)
 
 tokens = api.get_tokens()
 for token in tokens.private:
-    print(vars(token))
+    print(token.symbol, token.name, token.contract_address)
 
 current_prices = api.get_prices(tokens.private[0].contract_address, ['USD', 'CHF'])
 print(f'Prices for token {tokens.private[0].symbol}: {str(current_prices)}')
 
 days_back = 5
 historical_prices = list(api.get_prices_history(tokens.private[0].contract_address, 'USD', days_back))
-print(f'Historical price for token {tokens.private[0].symbol} {days_back} ago: {vars(historical_prices[0])}')
+print(f'Historical price for token {tokens.private[0].symbol} {days_back} ago: {historical_prices[0].price} (at {historical_prices[0].time})')
 
 latest_transactions = list(api.get_transactions())
 print(f'Retrieved the last {len(latest_transactions)}')
 
 latest_transaction = latest_transactions[0]
 
+# iterate over the complete history without loading it into memory at once
+history_count = sum(1 for _ in api.iter_transactions(contract_address=tokens.private[0].contract_address))
+print(f'Token {tokens.private[0].symbol} has {history_count} transactions')
+
 latest_transaction = api.get_transaction(latest_transaction.hash)
 print(f'Latest transaction {latest_transaction.hash} has {latest_transaction.confirms} confirmations.')
 
 sending_address = api.get_address(latest_transaction.from_address)
 print(f'Sending address {latest_transaction.from_address} has the following balances:')
 for token_name, balance in sending_address.private_balances.items():
-    print(f'{token_name}: {vars(balance)}')
+    print(f'{token_name}: {balance.balance}')
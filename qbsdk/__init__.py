@@ -1,4 +1,40 @@
 name="qbsdk"
 
+import importlib
+
 from qbsdk.api import Api, Mode, Token, Tokens, Transaction, TransactionState, Address, Balance
-from qbsdk.wallet import Wallet, TransferStrategy
+from qbsdk.confirmations import ConfirmationTracker
+from qbsdk.cache import TTLCache
+from qbsdk.metrics import HistogramAggregator, RequestObserver
+
+# classes whose modules import web3 and eth_account, loaded on first access so that `import qbsdk`
+# stays fast for users of the Api only
+_LAZY_ATTRIBUTES = {
+    'Wallet': 'qbsdk.wallet',
+    'TransferStrategy': 'qbsdk.wallet',
+    'BatchCoalescer': 'qbsdk.coalescer',
+    'ContractRegistry': 'qbsdk.registry'
+}
+
+# submodules importing web3 or eth_account, available as attributes (e.g. `qbsdk.wallet.TxData`) on first access
+_LAZY_SUBMODULES = ('wallet', 'loyalty_token', 'builder', 'signing', 'bulk', 'coalescer', 'registry', 'keystore',
+                    'simulator')
+
+__all__ = ['Api', 'Mode', 'Token', 'Tokens', 'Transaction', 'TransactionState', 'Address', 'Balance',
+           'ConfirmationTracker', 'TTLCache', 'HistogramAggregator', 'RequestObserver'] + list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(attribute):
+    if attribute in _LAZY_SUBMODULES:
+        # importing a submodule also sets it as an attribute of this package
+        return importlib.import_module(f'{__name__}.{attribute}')
+    module_name = _LAZY_ATTRIBUTES.get(attribute)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {attribute!r}')
+    value = getattr(importlib.import_module(module_name), attribute)
+    globals()[attribute] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | set(_LAZY_SUBMODULES))
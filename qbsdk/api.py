@@ -2,8 +2,16 @@ import logging
 
 from enum import Enum
 import requests
-from typing import Iterator, List, Dict
+from requests.adapters import HTTPAdapter
+from typing import Callable, Iterator, List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import math
+import time
 import qbsdk.error as errors
+from qbsdk.cache import TTLCache
+from qbsdk.metadata_cache import MetadataCache
+from qbsdk.metrics import RequestMetrics, RequestObserver, notify
+import qbsdk.decoding as decoding
 
 log = logging.getLogger(__name__)
 
@@ -29,7 +37,38 @@ API_HOSTS = {
 
 API_VERSION = '0.0.1'
 
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_HISTORY_WORKERS = 4
+STREAM_CHUNK_SIZE = 64 * 1024
+
+class _LazyField(object):
+    """
+     Non-data descriptor decoding one field of a lazy model from its `_json`. The decoded value is cached in the
+     instance `__dict__`, which takes precedence over the descriptor on every later read.
+    """
+    __slots__ = ('name', 'decode')
+
+    def __init__(self, name: str, decode: Callable[[dict], object]):
+        self.name = name
+        self.decode = decode
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.decode(instance._json)
+        return value
+
+
+def _add_lazy_fields(lazy_model: type, fields: Dict[str, Callable[[dict], object]]):
+    for name, decode in fields.items():
+        setattr(lazy_model, name, _LazyField(name, decode))
+
+
 class Token(object):
+    __slots__ = ('contract_address', 'decimals', 'description', 'name', 'rate', 'symbol', 'total_supply',
+                 'token_type')
+
     def __init__(self, json_object):
         self.contract_address: str = json_object['contractAddress']
         self.decimals: int = json_object['decimals']
@@ -40,8 +79,42 @@ class Token(object):
         self.total_supply: int = json_object['totalSupply']
         self.token_type: TokenType = TokenType(json_object['tokenType'])
 
+    def to_json(self) -> dict:
+        """
+        :return: the token in the format of the API, as accepted by the constructor.
+        """
+        return {
+            'contractAddress': self.contract_address,
+            'decimals': self.decimals,
+            'description': self.description,
+            'name': self.name,
+            'rate': self.rate,
+            'symbol': self.symbol,
+            'totalSupply': self.total_supply,
+            'tokenType': self.token_type.value
+        }
+
+    def _matches(self, json_object) -> bool:
+        return self.total_supply == json_object['totalSupply'] and self.name == json_object['name'] \
+            and self.symbol == json_object['symbol'] and self.description == json_object['description'] \
+            and self.decimals == json_object['decimals'] and self.rate == json_object['rate'] \
+            and self.token_type.value == json_object['tokenType']
+
+
+# Tokens embedded in transactions, shared by contract address instead of being built once per transaction.
+_shared_tokens: Dict[str, Token] = {}
+
+def _shared_token(json_object) -> Token:
+    token = _shared_tokens.get(json_object['contractAddress'])
+    if token is None or not token._matches(json_object):
+        token = Token(json_object)
+        _shared_tokens[token.contract_address] = token
+    return token
+
 
 class Tokens(object):
+    __slots__ = ('public', 'private')
+
     def __init__(self, private, public):
         self.public: List[Token] = public
         self.private: List[Token] = private
@@ -53,33 +126,77 @@ class TransactionState(Enum):
 
 
 class Transaction(object):
+    __slots__ = ('block_hash', 'block_number', 'chain_id', 'from_address', 'hash', 'input', 'nonce', 'to_address',
+                 'transaction_index', 'value', 'status', 'contract', 'timestamp', 'confirms', 'token', 'state')
+
     def __init__(self, json_object):
 
-        self.block_hash: str = json_object['blockHash'] if 'blockHash' in json_object else None
-        self.block_number: int = json_object['blockNumber'] if 'blockNumber' in json_object else None
-        self.chain_id: int = json_object['chainId'] if 'chainId' in json_object else None
-        self.from_address: str = json_object['from'] if 'from' in json_object else None
+        self.block_hash: str = json_object.get('blockHash')
+        self.block_number: int = json_object.get('blockNumber')
+        self.chain_id: int = json_object.get('chainId')
+        self.from_address: str = json_object.get('from')
         self.hash: str = json_object['hash']
-        self.input: str = json_object['input'] if 'input' in json_object else None
+        self.input: str = json_object.get('input')
         self.nonce: int = json_object['nonce']
-        self.to_address: str = json_object['to'] if 'to' in json_object else None
-        self.transaction_index: int = json_object['transactionIndex'] if 'transactionIndex' in json_object else None
+        self.to_address: str = json_object.get('to')
+        self.transaction_index: int = json_object.get('transactionIndex')
         self.value: int = int(json_object['value']) if 'value' in json_object else None
-        self.status: bool = json_object['status'] if 'status' in json_object else None
+        self.status: bool = json_object.get('status')
         self.contract: str = json_object['contract'] if 'contract' in json_object else json_object['contractAddress']
-        self.timestamp: int = json_object['timestamp'] if 'timestamp' in json_object else None
-        self.confirms: int = json_object['confirms'] if 'confirms' in json_object else None
-        self.token: Token = Token(json_object['token']) if 'token' in json_object else None
+        self.timestamp: int = json_object.get('timestamp')
+        self.confirms: int = json_object.get('confirms')
+        self.token: Token = _shared_token(json_object['token']) if 'token' in json_object else None
         self.state: TransactionState = TransactionState(json_object['state'])
 
+    @staticmethod
+    def lazy(json_object) -> 'Transaction':
+        """
+        Build a Transaction that keeps `json_object` and only decodes a field when it is first read.
+        """
+        return _LazyTransaction(json_object)
+
+
+_TRANSACTION_FIELDS = {
+    'block_hash': lambda json_object: json_object.get('blockHash'),
+    'block_number': lambda json_object: json_object.get('blockNumber'),
+    'chain_id': lambda json_object: json_object.get('chainId'),
+    'from_address': lambda json_object: json_object.get('from'),
+    'hash': lambda json_object: json_object['hash'],
+    'input': lambda json_object: json_object.get('input'),
+    'nonce': lambda json_object: json_object['nonce'],
+    'to_address': lambda json_object: json_object.get('to'),
+    'transaction_index': lambda json_object: json_object.get('transactionIndex'),
+    'value': lambda json_object: int(json_object['value']) if 'value' in json_object else None,
+    'status': lambda json_object: json_object.get('status'),
+    'contract': lambda json_object: json_object['contract'] if 'contract' in json_object
+        else json_object['contractAddress'],
+    'timestamp': lambda json_object: json_object.get('timestamp'),
+    'confirms': lambda json_object: json_object.get('confirms'),
+    'token': lambda json_object: _shared_token(json_object['token']) if 'token' in json_object else None,
+    'state': lambda json_object: TransactionState(json_object['state'])
+}
+
+
+class _LazyTransaction(Transaction):
+    __slots__ = ('_json', '__dict__')
+
+    def __init__(self, json_object):
+        self._json = json_object
+
+_add_lazy_fields(_LazyTransaction, _TRANSACTION_FIELDS)
+
 
 class Balance:
+    __slots__ = ('balance', 'contract_address')
+
     balance: int
     def __init__(self, json_object):
         self.balance: int = int(json_object['balance'])
         self.contract_address: str = json_object['contractAddress']
 
 class Address:
+    __slots__ = ('transaction_count', 'private_balances', 'public_balances')
+
     def __init__(self, json_object):
         self.transaction_count: int = json_object['transactionCount']
 
@@ -94,40 +211,176 @@ class Address:
                 self.public_balances[symbol] = Balance(json_balance)
 
 class Block:
+    __slots__ = ('author', 'extra_data', 'hash', 'miner', 'number', 'parent_hash', 'seal_fields', 'receipts_root',
+                 'sha3_uncles', 'signature', 'size', 'state_root', 'step', 'timestamp', 'transactions',
+                 'transactions_root', 'chain_id')
+
     def __init__(self, json_object):
-        self.author: str = json_object['author'] if 'author' in json_object else None
+        self.author: str = json_object.get('author')
         self.extra_data: str = json_object['extraData']
         self.hash: str = json_object['hash']
         self.miner: str = json_object['miner']
         self.number: int = json_object['number']
         self.parent_hash: int = json_object['parentHash']
-        self.seal_fields: int = json_object['receiptsRoot']
         self.receipts_root: int = json_object['receiptsRoot']
-        self.seal_fields: List[str] = json_object['sealFields'] if 'sealFields' in json_object else None
+        self.seal_fields: List[str] = json_object.get('sealFields')
         self.sha3_uncles: List[str] = json_object['sha3Uncles']
-        self.signature: str = json_object['signature'] if 'signature' in json_object else None
+        self.signature: str = json_object.get('signature')
         self.size: int = json_object['size']
         self.state_root: str = json_object['stateRoot']
-        self.step: str = json_object['step']  if 'step' in json_object else None
+        self.step: str = json_object.get('step')
         self.timestamp: str = json_object['timestamp']
         self.transactions: List[str] = json_object['transactions']
         self.transactions_root: str = json_object['transactionsRoot']
         self.chain_id: str = json_object['chainId']
 
+    @staticmethod
+    def lazy(json_object) -> 'Block':
+        """
+        Build a Block that keeps `json_object` and only decodes a field when it is first read.
+        """
+        return _LazyBlock(json_object)
+
+
+_BLOCK_FIELDS = {
+    'author': lambda json_object: json_object.get('author'),
+    'extra_data': lambda json_object: json_object['extraData'],
+    'hash': lambda json_object: json_object['hash'],
+    'miner': lambda json_object: json_object['miner'],
+    'number': lambda json_object: json_object['number'],
+    'parent_hash': lambda json_object: json_object['parentHash'],
+    'receipts_root': lambda json_object: json_object['receiptsRoot'],
+    'seal_fields': lambda json_object: json_object.get('sealFields'),
+    'sha3_uncles': lambda json_object: json_object['sha3Uncles'],
+    'signature': lambda json_object: json_object.get('signature'),
+    'size': lambda json_object: json_object['size'],
+    'state_root': lambda json_object: json_object['stateRoot'],
+    'step': lambda json_object: json_object.get('step'),
+    'timestamp': lambda json_object: json_object['timestamp'],
+    'transactions': lambda json_object: json_object['transactions'],
+    'transactions_root': lambda json_object: json_object['transactionsRoot'],
+    'chain_id': lambda json_object: json_object['chainId']
+}
+
+
+class _LazyBlock(Block):
+    __slots__ = ('_json', '__dict__')
+
+    def __init__(self, json_object):
+        self._json = json_object
+
+_add_lazy_fields(_LazyBlock, _BLOCK_FIELDS)
+
 class TimestampedPrice:
+    __slots__ = ('time', 'price')
+
     def __init__(self, json_object):
         self.time: int = json_object['time']
         self.price: float = json_object['price']
 
-def do_request(api_base_url: str, method: str, path: str, params=None, data=None, api_key=None):
+def _transaction_order_key(json_tx: dict) -> tuple:
+    # pending transactions have no timestamp/block yet and are the most recent ones
+    timestamp = json_tx.get('timestamp')
+    block_number = json_tx.get('blockNumber')
+    transaction_index = json_tx.get('transactionIndex')
+    return (timestamp if timestamp is not None else math.inf,
+            block_number if block_number is not None else math.inf,
+            transaction_index if transaction_index is not None else math.inf)
+
+def _fill_history_gap(fetch: Callable[[int, int], List[dict]], page_size: int, offset: int, first_hash: str,
+                      json_txs_by_hash: Dict[str, dict]):
+    """
+    Pages sequentially from `offset` to the transaction `first_hash`, and collects it and the transactions after it
+    until reaching one collected before. Arriving transactions only move the others to higher offsets, so
+    sequential pages can not skip any.
+    """
+    known_hashes = set(json_txs_by_hash)
+    found = False
+    while True:
+        page = fetch(offset, page_size)
+        for json_tx in page:
+            if json_tx['hash'] == first_hash:
+                found = True
+            elif found and json_tx['hash'] in known_hashes:
+                return
+            if found:
+                json_txs_by_hash[json_tx['hash']] = json_tx
+        if len(page) < page_size:
+            return
+        offset += page_size
+
+def _stream_json_array(response: requests.Response) -> Iterator[object]:
+    with response:
+        yield from decoding.iter_json_array(response.iter_content(STREAM_CHUNK_SIZE))
+
+def _observed_send(requester, metrics: RequestMetrics, observers: List[RequestObserver], stream: bool,
+                   method: str, url: str, **kwargs) -> Tuple[requests.Response, float]:
+    started = time.perf_counter()
+    try:
+        response = requester.request(method, url, stream=stream, **kwargs)
+    except Exception as error:
+        metrics.total_seconds = time.perf_counter() - started
+        metrics.error = error
+        notify(observers, metrics)
+        raise
+
+    body = response.request.body
+    metrics.status_code = response.status_code
+    metrics.request_bytes = len(body) if body is not None else 0
+    metrics.ttfb_seconds = response.elapsed.total_seconds()
+    # only set by urllib3 if the session's adapter was mounted with max_retries
+    retries = getattr(response.raw, 'retries', None)
+    metrics.retries = len(retries.history) if retries is not None else 0
+    if not stream or response.status_code >= 400:
+        metrics.response_bytes = len(response.content)
+        metrics.total_seconds = time.perf_counter() - started
+        notify(observers, metrics)
+    return response, started
+
+def _observed_stream(response: requests.Response, metrics: RequestMetrics, observers: List[RequestObserver],
+                     started: float) -> Iterator[object]:
+    # the request is reported once its body is received completely, or iteration stopped
+    def chunks():
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            metrics.response_bytes += len(chunk)
+            yield chunk
+
+    try:
+        with response:
+            yield from decoding.iter_json_array(chunks())
+    except Exception as error:
+        metrics.error = error
+        raise
+    finally:
+        metrics.total_seconds = time.perf_counter() - started
+        notify(observers, metrics)
+
+def do_request(api_base_url: str, method: str, path: str, params=None, data=None, api_key=None,
+               session: requests.Session = None, json_loads: Callable[[bytes], object] = None, stream: bool = False,
+               endpoint_template: str = None, observers: List[RequestObserver] = None):
     headers = {
         'ApiVersion': API_VERSION
     }
 
     if api_key is not None:
         headers['Authorization'] = f'Bearer {api_key}'
-    response = requests.request(method, f'{api_base_url}{path}', params=params, data=data, headers=headers)
-    json_body = response.json()
+
+    # without a session every call opens (and tears down) its own TCP+TLS connection
+    requester = session if session is not None else requests
+    if not observers:
+        response = requester.request(method, f'{api_base_url}{path}', params=params, data=data, headers=headers,
+                                     stream=stream)
+    else:
+        metrics = RequestMetrics(endpoint_template or path, method, started_at=time.time())
+        response, started = _observed_send(requester, metrics, observers, stream, method, f'{api_base_url}{path}',
+                                           params=params, data=data, headers=headers)
+    if stream and response.status_code < 400:
+        # a JSON array body is decoded element by element while it is being received
+        if observers:
+            return _observed_stream(response, metrics, observers, started)
+        return _stream_json_array(response)
+
+    json_body = (json_loads or decoding.loads)(response.content)
     if response.status_code == 400:
         raise errors.InvalidRequestError(json_body['message'], 400)
     if response.status_code == 404:
@@ -146,17 +399,87 @@ class Api(object):
     api_key: str
     mode: Mode
     api_host: str
-    def __init__(self, api_key: str, mode : Mode =Mode.sandbox):
+    def __init__(self, api_key: str, mode : Mode =Mode.sandbox,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 pool_block: bool = False,
+                 cache: TTLCache = None,
+                 lazy_models: bool = False,
+                 json_loads: Callable[[bytes], object] = None,
+                 metadata_cache: MetadataCache = None,
+                 observers: List[RequestObserver] = None):
         """The :class:`Api` object, represents a connection to the qiibee API which facilitates
          executing reads and transactions on the qiibee blockchain.
 
+        Requests are sent through a pooled keep-alive session owned by this instance. Call :meth:`close`
+        (or use the instance as a context manager) to release its connections.
+
         :param str api_key: The brand API key (secret)
-        :param str brand_address_private_key: The loyalty token source brand address private key
-        :param int token_symbol: the symbol of the brand's token
+        :param Mode mode: the qiibee environment to connect to. Defaults to `sandbox`.
+        :param int pool_connections: number of per-host connection pools to cache.
+        :param int pool_maxsize: maximum number of keep-alive connections kept open per host.
+        :param bool pool_block: if True, block when all `pool_maxsize` connections of a host are busy
+         instead of opening an extra, non-pooled connection.
+        :param TTLCache cache: (optional) cache for the responses of get_token, get_tokens, get_last_block,
+         get_prices and get_prices_history.
+        :param bool lazy_models: if True, returned :class:`Transaction` and :class:`Block` objects decode each field
+         from the response on first access instead of all fields upfront.
+        :param json_loads: (optional) function decoding a response body. Defaults to the standard library json
+         module. `orjson.loads` is faster, but decodes integers above 64 bits (e.g. the total supply of a token
+         with 18 decimals) as floats, losing precision.
+        :param MetadataCache metadata_cache: (optional) persistent cache consulted first by get_token and by
+         :meth:`Wallet.setup <Wallet.setup>` for token records and the chain id.
+        :param observers: (optional) :class:`RequestObserver <qbsdk.metrics.RequestObserver>` objects notified with
+         the timings of every request, e.g. a :class:`HistogramAggregator <qbsdk.metrics.HistogramAggregator>`.
         """
         self.api_key = api_key
         self.mode = mode
         self.api_host = API_HOSTS[self.mode]
+        self.cache = cache
+        self.json_loads = json_loads
+        self.metadata_cache = metadata_cache
+        self.observers = list(observers) if observers is not None else []
+        self._transaction = Transaction.lazy if lazy_models else Transaction
+        self._block = Block.lazy if lazy_models else Block
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+
+    def close(self):
+        """
+        Close all pooled connections. The instance must not be used for requests afterwards.
+        """
+        self._session.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def _request(self, method: str, path: str, params=None, data=None, api_key=None, stream: bool = False,
+                 endpoint_template: str = None):
+        return do_request(self.api_host, method, path, params=params, data=data, api_key=api_key,
+                          session=self._session, json_loads=self.json_loads, stream=stream,
+                          endpoint_template=endpoint_template, observers=self.observers)
+
+
+    def _cached_request(self, endpoint: str, path: str, params=None, endpoint_template: str = None):
+        if self.cache is None:
+            return self._request('GET', path, params=params, endpoint_template=endpoint_template)
+
+        key = (path, tuple(sorted(params.items())) if params is not None else ())
+        json_body = self.cache.get(endpoint, key)
+        if json_body is None:
+            json_body = self._request('GET', path, params=params, endpoint_template=endpoint_template)
+            self.cache.set(endpoint, key, json_body)
+        return json_body
 
 
     def get_token(self, contract_address: str) -> Token:
@@ -165,8 +488,11 @@ class Api(object):
         :return: :class:`Token` object
         """
 
-        json_body = do_request(self.api_host, 'GET', f'/tokens/{contract_address}')
-        return Token(json_body['private'])
+        json_token = self._cached_metadata(
+            f'token:{contract_address.lower()}',
+            lambda: Token(self._cached_request('token', f'/tokens/{contract_address}',
+                                               endpoint_template='/tokens/{contract_address}')['private']).to_json())
+        return Token(json_token)
 
 
     def get_tokens(self, include_public_tokens: bool =False, wallet_address = None) -> Tokens:
@@ -184,7 +510,7 @@ class Api(object):
         if include_public_tokens:
             query_params['public'] = 'true'
 
-        json_body = do_request(self.api_host, 'GET', '/tokens', params=query_params)
+        json_body = self._cached_request('tokens', '/tokens', params=query_params)
         private = list(map(lambda json_token: Token(json_token), json_body['private']))
         public = list(map(lambda json_token: Token(json_token), json_body['public'])) if include_public_tokens else []
         return Tokens(private, public)
@@ -196,8 +522,8 @@ class Api(object):
         :param tx_hash: the blockchain transaction hash.
         :return: :class:`Transaction <Transaction>` object
         """
-        json_body = do_request(self.api_host, 'GET', f'/transactions/{tx_hash}')
-        return Transaction(json_body)
+        json_body = self._request('GET', f'/transactions/{tx_hash}', endpoint_template='/transactions/{hash}')
+        return self._transaction(json_body)
 
 
     def get_raw_transaction(self,
@@ -214,13 +540,13 @@ class Api(object):
             'contractAddress': contract_address,
             'txType': transaction_type.value
         }
-        json_body = do_request(self.api_host, 'GET', f'/transactions/raw', params=params)
+        json_body = self._request('GET', f'/transactions/raw', params=params)
 
         return json_body
 
     def get_transactions(self, wallet: str = None,
                          limit: int = 100, offset: int = 0,
-                         symbol: str = None, contract_address=None) -> Iterator[Transaction]:
+                         symbol: str = None, contract_address=None, stream: bool = False) -> Iterator[Transaction]:
         """
         Retrieve a paged list of transactions ordered descending by their blockchain timestamp.
         :param wallet: (optional) specify a 'wallet' filter to return only transactions to or from that wallet address.
@@ -228,9 +554,146 @@ class Api(object):
         :param offset: (optional) specify an offset for the page of transactions to be returned (defaults to 0).
         :param symbol: specify a token symbol to only return transactions belonging to a particular token. (either specify symbol or contract address)
         :param contract_address: specify a contract address to only return transactions belonging to a particular token  with that contract address.
+        :param stream: (optional) parse the response incrementally, yielding each transaction as soon as it has been
+         received instead of after the whole page has been downloaded (defaults to False).
         :return: Iterator[Transaction]
         """
 
+        json_body = self._get_transactions_json(wallet, limit, offset, symbol, contract_address, stream=stream)
+        return map(lambda json_tx: self._transaction(json_tx), json_body)
+
+
+    def iter_transactions(self, wallet: str = None,
+                          symbol: str = None, contract_address=None,
+                          page_size: int = 100, prefetch: bool = True) -> Iterator[Transaction]:
+        """
+        Lazily iterate over all transactions, ordered descending by their blockchain timestamp, fetching pages on demand.
+        With prefetch enabled the next page is requested in the background while the current one is consumed,
+        so at most two pages are held in memory.
+        :param wallet: (optional) specify a 'wallet' filter to return only transactions to or from that wallet address.
+        :param symbol: specify a token symbol to only return transactions belonging to a particular token.
+        :param contract_address: specify a contract address to only return transactions belonging to a particular token  with that contract address.
+        :param page_size: (optional) number of transactions per request (defaults to 100).
+        :param prefetch: (optional) fetch the next page in the background (defaults to True).
+        :return: Iterator[Transaction]
+        """
+        for page in self._iter_transaction_pages(wallet, symbol, contract_address, page_size, prefetch):
+            for json_tx in page:
+                yield self._transaction(json_tx)
+
+
+    def get_transaction_history(self, wallet: str = None,
+                                symbol: str = None, contract_address=None,
+                                page_size: int = 100, max_workers: int = DEFAULT_HISTORY_WORKERS) -> List[Transaction]:
+        """
+        Retrieve the complete list of transactions, fetching up to `max_workers` pages concurrently.
+        Transactions repeated across pages (when new ones arrive during the scan) are only returned once.
+        :param wallet: (optional) specify a 'wallet' filter to return only transactions to or from that wallet address.
+        :param symbol: specify a token symbol to only return transactions belonging to a particular token.
+        :param contract_address: specify a contract address to only return transactions belonging to a particular token  with that contract address.
+        :param page_size: (optional) number of transactions per request (defaults to 100).
+        :param max_workers: (optional) maximum number of concurrent requests.
+        :return: List[Transaction] ordered descending by their blockchain timestamp.
+        """
+        json_txs = self._get_transaction_history_json(wallet, symbol, contract_address, page_size, max_workers)
+        return list(map(lambda json_tx: self._transaction(json_tx), json_txs))
+
+
+    def get_transaction_columns(self, wallet: str = None,
+                                symbol: str = None, contract_address=None,
+                                page_size: int = 100, max_workers: int = DEFAULT_HISTORY_WORKERS,
+                                value_dtype: str = 'float64', as_dataframe: bool = False):
+        """
+        Retrieve the complete list of transactions like :meth:`get_transaction_history`, as typed NumPy columns
+        built straight from the responses without creating a :class:`Transaction` per row.
+        Requires numpy, and pandas if `as_dataframe` is True.
+        :param value_dtype: (optional) dtype of the `value` column, `float64` (defaults) or `object` for exact ints.
+        :param as_dataframe: (optional) return a pandas DataFrame instead of a dict of arrays (defaults to False).
+        :return: Dict[str, numpy.ndarray] or pandas.DataFrame, see :mod:`qbsdk.columnar` for the columns.
+        """
+        # imported here so that importing qbsdk does not import numpy
+        import qbsdk.columnar as columnar
+
+        json_txs = self._get_transaction_history_json(wallet, symbol, contract_address, page_size, max_workers)
+        if as_dataframe:
+            return columnar.transactions_to_dataframe(json_txs, value_dtype=value_dtype)
+        return columnar.transactions_to_columns(json_txs, value_dtype=value_dtype)
+
+
+    def _get_transaction_history_json(self, wallet: str, symbol: str, contract_address: str,
+                                      page_size: int, max_workers: int) -> List[dict]:
+        def fetch(offset: int, limit: int) -> List[dict]:
+            return self._get_transactions_json(wallet, limit, offset, symbol, contract_address)
+
+        # pages in flight in parallel see shifted offsets if transactions arrive meanwhile, each page is fetched
+        # with the first transaction of the next one to check that the pages connect
+        pages: Dict[int, List[dict]] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            next_page_index = 0
+            last_page_index = None
+            while next_page_index < max_workers:
+                futures[next_page_index] = executor.submit(fetch, next_page_index * page_size, page_size + 1)
+                next_page_index += 1
+
+            while len(futures) > 0:
+                done, _ = wait(futures.values(), return_when=FIRST_COMPLETED)
+                for page_index in [index for index, future in futures.items() if future in done]:
+                    page = futures.pop(page_index).result()
+                    pages[page_index] = page
+                    if len(page) <= page_size and (last_page_index is None or page_index < last_page_index):
+                        last_page_index = page_index
+
+                # keep max_workers pages in flight until the end of the history has been seen
+                while last_page_index is None and len(futures) < max_workers:
+                    futures[next_page_index] = executor.submit(fetch, next_page_index * page_size, page_size + 1)
+                    next_page_index += 1
+
+        json_txs_by_hash: Dict[str, dict] = {}
+        for page in pages.values():
+            for json_tx in page[:page_size]:
+                json_txs_by_hash[json_tx['hash']] = json_tx
+        for page_index in sorted(pages):
+            page = pages[page_index]
+            if len(page) > page_size and page[page_size]['hash'] not in json_txs_by_hash:
+                # the next page was fetched before more transactions arrived than this one, the transactions
+                # in between are in neither
+                log.debug(f'Transaction history page {page_index + 1} does not connect to page {page_index}.')
+                _fill_history_gap(fetch, page_size, (page_index + 1) * page_size, page[page_size]['hash'],
+                                  json_txs_by_hash)
+
+        return sorted(json_txs_by_hash.values(), key=_transaction_order_key, reverse=True)
+
+
+    def _iter_transaction_pages(self, wallet: str, symbol: str, contract_address: str,
+                                page_size: int, prefetch: bool) -> Iterator[List[dict]]:
+        def fetch(offset: int) -> List[dict]:
+            return self._get_transactions_json(wallet, page_size, offset, symbol, contract_address)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            offset = 0
+            next_page = executor.submit(fetch, offset) if prefetch else None
+            previous_hashes = set()
+            while True:
+                page = next_page.result() if prefetch else fetch(offset)
+                offset += len(page)
+                is_last_page = len(page) < page_size
+                if prefetch and not is_last_page:
+                    next_page = executor.submit(fetch, offset)
+
+                # transactions arriving while paging shift the offsets, which repeats entries of the previous page
+                hashes = set(map(lambda json_tx: json_tx['hash'], page))
+                page = list(filter(lambda json_tx: json_tx['hash'] not in previous_hashes, page))
+                previous_hashes = hashes
+
+                if len(page) > 0:
+                    yield page
+                if is_last_page:
+                    return
+
+
+    def _get_transactions_json(self, wallet: str, limit: int, offset: int,
+                               symbol: str, contract_address: str, stream: bool = False) -> List[dict]:
         query_params = {
             'offset': offset,
             'limit': limit
@@ -242,9 +705,7 @@ class Api(object):
         if contract_address is not None:
             query_params['contractAddress'] = contract_address
 
-
-        json_body = do_request(self.api_host, 'GET', f'/transactions', params=query_params)
-        return map(lambda json_tx: Transaction(json_tx), json_body)
+        return self._request('GET', f'/transactions', params=query_params, stream=stream)
 
 
     def get_address(self, address: str) -> Address:
@@ -253,18 +714,18 @@ class Api(object):
         :param address:
         :return: :class:`Address <Address>` object
         """
-        json_body = do_request(self.api_host, 'GET', f'/addresses/{address}')
+        json_body = self._request('GET', f'/addresses/{address}', endpoint_template='/addresses/{address}')
         return Address(json_body)
 
 
     def post_transaction(self, signed_tx_hex_string: str) -> Transaction:
 
-        json_body = do_request(self.api_host, 'POST', f'/transactions/', data={
+        json_body = self._request('POST', f'/transactions/', data={
             'data': signed_tx_hex_string
         })
 
         json_body.pop('status', None)
-        return Transaction(json_body)
+        return self._transaction(json_body)
 
 
     def get_last_block(self) -> Block:
@@ -272,14 +733,45 @@ class Api(object):
         Retrieve details of the last block in the chain.
         :return: :class:`Block <Block>` object
         """
-        json_body = do_request(self.api_host, 'GET', f'/net')
-        return Block(json_body)
+        json_body = self._cached_request('net', f'/net')
+        return self._block(json_body)
+
+
+    def _get_private_tokens(self, wallet_address: str = None) -> List[Token]:
+        # the API may answer differently per wallet filter, each is cached on its own
+        key = f'tokens:{wallet_address.lower()}' if wallet_address is not None else 'tokens'
+        json_tokens = self._cached_metadata(
+            key,
+            lambda: list(map(lambda token: token.to_json(), self.get_tokens(wallet_address=wallet_address).private)))
+        return list(map(lambda json_token: Token(json_token), json_tokens))
+
+
+    def _get_chain_id(self) -> int:
+        return self._cached_metadata('chain_id', lambda: self.get_last_block().chain_id)
+
+
+    def _cached_metadata(self, key: str, fetch: Callable[[], object]):
+        if self.metadata_cache is None:
+            return fetch()
+
+        value = self.metadata_cache.get(self.mode, key)
+        if value is not None:
+            return value
+        try:
+            value = fetch()
+        except requests.exceptions.RequestException as e:
+            value = self.metadata_cache.get(self.mode, key, stale=True)
+            if value is None:
+                raise
+            log.warning(f'Could not revalidate cached {key}, using the stale value: {e}')
+            return value
+        self.metadata_cache.set(self.mode, key, value)
+        return value
 
 
     def _get_address_next_nonce(self, brand_address: str) -> int:
-        json_body = do_request(self.api_host,
-                               'GET', f'/addresses/{brand_address}/nextnonce',
-                               api_key=self.api_key)
+        json_body = self._request('GET', f'/addresses/{brand_address}/nextnonce', api_key=self.api_key,
+                                  endpoint_template='/addresses/{address}/nextnonce')
 
         return int(json_body['result'], 16)
 
@@ -299,16 +791,18 @@ class Api(object):
         if to_currency_symbols is not None and len(to_currency_symbols) > 0:
             currency_symbols_joined = ','.join(to_currency_symbols)
             query_params['to'] = currency_symbols_joined
-        json_body = do_request(self.api_host, 'GET', f'/prices', params=query_params)
-        return json_body
+        json_body = self._cached_request('prices', f'/prices', params=query_params)
+        return dict(json_body)
 
 
-    def get_prices_history(self, from_token_contract_address: str, currency_symbol: str, limit: int = None) -> Iterator[TimestampedPrice]:
+    def get_prices_history(self, from_token_contract_address: str, currency_symbol: str, limit: int = None,
+                           stream: bool = False) -> Iterator[TimestampedPrice]:
         """
         Returns the historical FIAT price values of one unit of a given Loyalty Token for a desired currency.
         This endpoint uses a third-party provider to get the ETH exchange rate.
         The QBX/ETH Exchange rate is fetched from the Coinsuper exchange.
-        :return:
+        :param stream: (optional) parse the response incrementally, bypassing the cache (defaults to False).
+        :return: Iterator[TimestampedPrice]
         """
 
         query_params = {
@@ -321,5 +815,8 @@ class Api(object):
             query_params['limit'] = limit
 
 
-        json_body = do_request(self.api_host, 'GET', f'/prices/history', params=query_params)
+        if stream:
+            json_body = self._request('GET', f'/prices/history', params=query_params, stream=True)
+        else:
+            json_body = self._cached_request('prices_history', f'/prices/history', params=query_params)
         return map(lambda json_tx: TimestampedPrice(json_tx), json_body)
@@ -0,0 +1,118 @@
+from typing import Dict, List
+
+from eth_utils import to_checksum_address
+
+import qbsdk.error as errors
+import qbsdk.loyalty_token as loyalty_token
+from qbsdk.api import TokenType, TransactionType
+from qbsdk.calldata import ContractEncoder
+
+DEFAULT_GAS = 1000000
+
+NOWALLET_FUNCTIONS = {
+    TransactionType.earn: 'earn',
+    TransactionType.debit: 'debit',
+    TransactionType.redeem: 'redeem'
+}
+
+NOWALLET_BATCH_FUNCTIONS = {
+    TransactionType.earn: 'earnBatch',
+    TransactionType.debit: 'debitBatch',
+    TransactionType.redeem: 'redeemBatch'
+}
+
+
+class BatchGasProfile:
+    """
+     Gas used by a batch call as a linear function of its size: `base + per_item * len(batch)`.
+    """
+
+    def __init__(self, base: int, per_item: int):
+        self.base = base
+        self.per_item = per_item
+
+    def gas(self, size: int) -> int:
+        return self.base + self.per_item * size
+
+    def max_items(self, gas_limit: int) -> int:
+        """
+        :return: the largest batch size whose gas fits in `gas_limit`.
+        """
+        return max((gas_limit - self.base) // self.per_item, 0)
+
+
+# upper bounds per batch function: each item costs its calldata (two 32 byte words), a balance update that may
+# initialize a storage slot (earn) or only modify one (debit, redeem), and an event.
+DEFAULT_BATCH_GAS_PROFILES: Dict[TransactionType, BatchGasProfile] = {
+    TransactionType.earn: BatchGasProfile(60000, 30000),
+    TransactionType.debit: BatchGasProfile(60000, 15000),
+    TransactionType.redeem: BatchGasProfile(60000, 15000)
+}
+
+
+class TransactionBuilder:
+    """
+     Builds the unsigned loyalty contract transactions sent by a :class:`Wallet <Wallet>`. It only depends on
+     the token type, contract address and chain id, so other processes can rebuild an identical builder from them.
+    """
+
+    def __init__(self, token_type: TokenType, contract_address: str, chain_id: int):
+        """
+        :param TokenType token_type: type of the loyalty token, selects the contract ABI.
+        :param str contract_address: address of the loyalty token contract.
+        :param int chain_id: id of the chain the transactions are signed for.
+        """
+        if token_type == TokenType.wallet:
+            abi = loyalty_token.abi
+        elif token_type == TokenType.nowallet:
+            abi = loyalty_token.no_wallet_abi
+        else:
+            raise errors.ConfigError(f'Unsupported token type: {token_type}')
+
+        self.abi = abi
+        self.token_type = token_type
+        self.contract_address = to_checksum_address(contract_address)
+        self.chain_id = chain_id
+        self._encoder = ContractEncoder(abi, self.contract_address)
+
+    def tx_params(self, nonce: int, gas: int = DEFAULT_GAS) -> dict:
+        return {
+            'nonce': nonce,
+            'gasPrice': 0,
+            'gas': gas,
+            'value': 0,
+            'chainId': self.chain_id
+        }
+
+    def check_tx_type(self, tx_type: TransactionType):
+        """
+        :raises UnsupportedOperationError: if single transactions of `tx_type` cannot be built for the token.
+        """
+        if self.token_type == TokenType.nowallet and tx_type not in NOWALLET_FUNCTIONS:
+            raise errors.UnsupportedOperationError(f'TransactionType {tx_type} not supported for nowallet tokens.')
+
+    def build(self, to: str, value: int, nonce: int, tx_type: TransactionType = None) -> dict:
+        """
+        :param to: receiver address. Wallet tokens accept any casing, nowallet tokens require a checksum address.
+        :param value: amount in wei.
+        :param nonce: transaction nonce.
+        :param tx_type: transaction type. Required for nowallet tokens, ignored for wallet tokens.
+        :return: the transaction dict, ready to be signed.
+        """
+        if self.token_type == TokenType.wallet:
+            return self._encoder.build_transaction('transfer', (to_checksum_address(to), value),
+                                                   self.tx_params(nonce))
+        self.check_tx_type(tx_type)
+        return self._encoder.build_transaction(NOWALLET_FUNCTIONS[tx_type], (to, value), self.tx_params(nonce))
+
+    def build_batch(self, to_array: List[str], amount_array: List[int], tx_type: TransactionType, nonce: int,
+                    gas: int = DEFAULT_GAS) -> dict:
+        """
+        :return: the transaction dict of a batch call crediting or debiting every address, ready to be signed.
+        """
+        if self.token_type != TokenType.nowallet:
+            raise errors.UnsupportedOperationError('The token type does not support sending batches.')
+        if tx_type not in NOWALLET_BATCH_FUNCTIONS:
+            raise errors.UnsupportedOperationError(f'TransactionType {tx_type} not supported for batches.')
+        return self._encoder.build_transaction(NOWALLET_BATCH_FUNCTIONS[tx_type], (to_array, amount_array),
+                                               self.tx_params(nonce, gas))
@@ -0,0 +1,71 @@
+"""
+Parallel signing of many transactions with consecutive nonces. Building and signing is CPU bound and holds the GIL,
+so the work is spread over a process pool. Every worker process parses the private key and compiles the contract
+encoder once, then signs whole chunks of consecutive nonces.
+
+On platforms that start worker processes with `spawn` (Windows, macOS) the calling script must guard its entry
+point with `if __name__ == '__main__':`.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from qbsdk.api import TokenType, TransactionType
+from qbsdk.builder import TransactionBuilder
+from qbsdk.signing import TransactionSigner
+
+DEFAULT_CHUNK_SIZE = 256
+
+# (to, value, tx_type)
+BulkItem = Tuple[str, int, TransactionType]
+
+# per worker process state, set by _init_worker
+_builder: TransactionBuilder = None
+_signer: TransactionSigner = None
+
+
+def _init_worker(private_key: str, token_type: TokenType, contract_address: str, chain_id: int):
+    global _builder, _signer
+    _builder = TransactionBuilder(token_type, contract_address, chain_id)
+    _signer = TransactionSigner(private_key)
+
+
+def _sign_items(builder: TransactionBuilder, signer: TransactionSigner, start_nonce: int,
+                items: List[BulkItem]) -> List[str]:
+    return [signer.sign(builder.build(to, value, start_nonce + offset, tx_type))
+            for offset, (to, value, tx_type) in enumerate(items)]
+
+
+def _sign_chunk(chunk: Tuple[int, List[BulkItem]]) -> List[str]:
+    return _sign_items(_builder, _signer, *chunk)
+
+
+def sign_transactions(private_key: str, builder: TransactionBuilder, items: List[BulkItem], start_nonce: int,
+                      processes: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[str]:
+    """
+    Sign one transaction per item, the i-th item with nonce `start_nonce + i`.
+    :param str private_key: hex encoded private key.
+    :param TransactionBuilder builder: builds the transactions. Workers rebuild an equivalent one.
+    :param items: (to, value, tx_type) per transaction.
+    :param int start_nonce: nonce of the first transaction.
+    :param int processes: (optional) number of worker processes, defaults to the number of CPUs.
+     With 1 process, or when everything fits in one chunk, signing happens in the calling process.
+    :param int chunk_size: number of consecutive transactions a worker signs per task.
+    :return: the 0x prefixed hex encoded signed transactions, in input order.
+    """
+    items = list(items)
+    # fail fast in this process: QiibeeErrors raised by a worker cannot be pickled back
+    for _, _, tx_type in items:
+        builder.check_tx_type(tx_type)
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(items) <= chunk_size:
+        return _sign_items(builder, TransactionSigner(private_key), start_nonce, items)
+
+    chunks = [(start_nonce + offset, items[offset:offset + chunk_size])
+              for offset in range(0, len(items), chunk_size)]
+    worker_args = (private_key, builder.token_type, builder.contract_address, builder.chain_id)
+
+    with ProcessPoolExecutor(max_workers=min(processes, len(chunks)), initializer=_init_worker,
+                             initargs=worker_args) as executor:
+        return [signed for signed_chunk in executor.map(_sign_chunk, chunks) for signed in signed_chunk]
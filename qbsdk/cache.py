@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+DEFAULT_MAXSIZE = 1024
+
+# seconds a response of each cacheable Api endpoint stays valid
+DEFAULT_TTLS = {
+    'token': 300,
+    'tokens': 300,
+    'net': 1,
+    'prices': 30,
+    'prices_history': 300
+}
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+
+
+class TTLCache:
+    """
+     Size-bounded LRU cache of Api responses with a time-to-live per endpoint.
+     Any object implementing `get`, `set` and `invalidate` with the same signatures can be given to
+     :class:`Api <Api>` instead.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttls: Dict[str, float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param int maxsize: maximum number of responses kept. The least recently used one is evicted first.
+        :param dict ttls: (optional) time-to-live in seconds per endpoint, overriding :data:`DEFAULT_TTLS`.
+         Endpoints with a TTL of 0 or None are not cached.
+        :param clock: returns the current time in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls is not None:
+            self.ttls.update(ttls)
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._stats: Dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str, key: Hashable):
+        """
+        :return: the cached value, or None if it is missing or expired.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, CacheStats())
+            entry = self._entries.get((endpoint, key))
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end((endpoint, key))
+                stats.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[(endpoint, key)]
+            stats.misses += 1
+            return None
+
+    def set(self, endpoint: str, key: Hashable, value):
+        ttl = self.ttls.get(endpoint)
+        if not ttl:
+            return
+        with self._lock:
+            self._entries[(endpoint, key)] = (self._clock() + ttl, value)
+            self._entries.move_to_end((endpoint, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint: str = None, key: Hashable = None):
+        """
+        Drop cached values. Without arguments everything is dropped, with an endpoint only that endpoint's values,
+        and with an endpoint and key only that value.
+        """
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+            elif key is not None:
+                self._entries.pop((endpoint, key), None)
+            else:
+                for cache_key in [cache_key for cache_key in self._entries if cache_key[0] == endpoint]:
+                    del self._entries[cache_key]
+
+    def stats(self) -> Dict[str, CacheStats]:
+        """
+        :return: hit and miss counters per endpoint.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def __len__(self):
+        return len(self._entries)
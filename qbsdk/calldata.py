@@ -0,0 +1,116 @@
+"""
+Precompiled ABI encoding of the loyalty token functions. Producing the calldata of a fixed function only requires
+the cached selector and packing of its arguments, instead of web3's per-call ABI resolution and generic encoding.
+Supported argument types are `address`, `uint256`, `bytes32` and dynamic arrays of these.
+"""
+from typing import Dict, List
+
+from eth_utils import function_signature_to_4byte_selector, is_checksum_address
+
+_WORD_SIZE = 32
+_MAX_UINT256 = 2 ** 256
+
+
+def _encode_uint256(value) -> bytes:
+    if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value < _MAX_UINT256:
+        raise ValueError(f'Invalid uint256 value: {value!r}')
+    return value.to_bytes(_WORD_SIZE, 'big')
+
+
+def _encode_address(value) -> bytes:
+    if not isinstance(value, str) or not is_checksum_address(value):
+        raise ValueError(f'Invalid address, only checksum addresses are accepted: {value!r}')
+    return bytes(12) + bytes.fromhex(value[2:])
+
+
+def _encode_bytes32(value) -> bytes:
+    if isinstance(value, str):
+        try:
+            value = bytes.fromhex(value[2:] if value.startswith(('0x', '0X')) else value)
+        except ValueError:
+            raise ValueError(f'Invalid bytes32 hex string: {value!r}')
+    if not isinstance(value, (bytes, bytearray)) or len(value) > _WORD_SIZE:
+        raise ValueError(f'Invalid bytes32 value: {value!r}')
+    return bytes(value) + bytes(_WORD_SIZE - len(value))
+
+
+_STATIC_ENCODERS = {
+    'uint256': _encode_uint256,
+    'address': _encode_address,
+    'bytes32': _encode_bytes32
+}
+
+
+def _is_supported(abi_type: str) -> bool:
+    return (abi_type[:-2] if abi_type.endswith('[]') else abi_type) in _STATIC_ENCODERS
+
+
+class FunctionEncoder:
+    """
+     Encodes the calldata of one ABI function.
+    """
+
+    def __init__(self, abi_function: dict):
+        self.name: str = abi_function['name']
+        self.input_types: List[str] = list(map(lambda abi_input: abi_input['type'], abi_function['inputs']))
+        self.selector: bytes = function_signature_to_4byte_selector(f'{self.name}({",".join(self.input_types)})')
+
+    def encode(self, *args) -> str:
+        """
+        :return: the 0x prefixed hex calldata of a call with the given arguments.
+        """
+        if len(args) != len(self.input_types):
+            raise ValueError(f'{self.name} expects {len(self.input_types)} arguments, got {len(args)}')
+
+        heads = []
+        tails = []
+        tail_offset = _WORD_SIZE * len(args)
+        for abi_type, value in zip(self.input_types, args):
+            if abi_type.endswith('[]'):
+                encode_element = _STATIC_ENCODERS[abi_type[:-2]]
+                tail = b''.join([_encode_uint256(len(value))] + list(map(encode_element, value)))
+                heads.append(_encode_uint256(tail_offset))
+                tails.append(tail)
+                tail_offset += len(tail)
+            else:
+                heads.append(_STATIC_ENCODERS[abi_type](value))
+
+        return '0x' + (self.selector + b''.join(heads) + b''.join(tails)).hex()
+
+
+# encoders per ABI, keyed by id() and holding a reference to the ABI so that the id cannot be reused
+_compiled_abis: Dict[int, tuple] = {}
+
+def _compile(abi: List[dict]) -> Dict[str, FunctionEncoder]:
+    compiled = _compiled_abis.get(id(abi))
+    if compiled is None or compiled[0] is not abi:
+        functions = {}
+        for abi_function in abi:
+            if abi_function.get('type') != 'function':
+                continue
+            if all(map(lambda abi_input: _is_supported(abi_input['type']), abi_function['inputs'])):
+                functions[abi_function['name']] = FunctionEncoder(abi_function)
+        compiled = (abi, functions)
+        _compiled_abis[id(abi)] = compiled
+    return compiled[1]
+
+
+class ContractEncoder:
+    """
+     Builds transactions calling the functions of a contract, equivalent to the result of
+     web3's `contract.functions.<name>(*args).buildTransaction(tx_params)` when `tx_params` specifies gas.
+    """
+
+    def __init__(self, abi: List[dict], checksum_address: str):
+        """
+        :param abi: contract ABI. Functions with unsupported argument types are skipped.
+        :param checksum_address: checksummed contract address.
+        """
+        self.address = checksum_address
+        self.functions: Dict[str, FunctionEncoder] = _compile(abi)
+
+    def build_transaction(self, function_name: str, args: tuple, tx_params: dict) -> dict:
+        transaction = dict(tx_params)
+        transaction['to'] = self.address
+        transaction['data'] = self.functions[function_name].encode(*args)
+        return transaction
@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+
+import qbsdk.error as errors
+from qbsdk.api import TokenType, Transaction, TransactionType
+from qbsdk.builder import DEFAULT_GAS, NOWALLET_BATCH_FUNCTIONS
+from qbsdk.wallet import TransferStrategy, TxData
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_DELAY = 0.05
+DEFAULT_MAX_IN_FLIGHT = 4
+
+
+class _Window:
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.tx_data_list = []
+        self.futures: List[Future] = []
+
+
+class BatchCoalescer:
+    """
+     Merges individual earn, debit and redeem calls of a nowallet token into batch transactions. Calls of the same
+     type are collected until the first of them has waited `max_delay` seconds or the batch is full, then sent as
+     one `earnBatch`/`debitBatch`/`redeemBatch` transaction with :meth:`Wallet.send_batch <Wallet.send_batch>`.
+     Every call in the batch is resolved with the same :class:`Transaction <Transaction>`, or fails with the
+     same error.
+     Sending batches concurrently (`max_in_flight` > 1) requires the `brand` TransferStrategy: wallets of the
+     `user` strategy take the nonce of each batch from the API, and concurrent batches would get the same one.
+    """
+
+    def __init__(self, wallet,
+                 max_delay: float = DEFAULT_MAX_DELAY,
+                 max_batch_size: int = None,
+                 max_in_flight: int = None):
+        """
+        :param Wallet wallet: a set up wallet of a nowallet token.
+        :param float max_delay: maximum seconds a call waits for others to join its batch.
+        :param int max_batch_size: (optional) maximum number of calls per batch. Defaults to what fits in the
+         wallet's default gas limit according to its `batch_gas_profiles`.
+        :param int max_in_flight: (optional) maximum number of batch transactions being sent at once. Defaults to
+         `DEFAULT_MAX_IN_FLIGHT` for the `brand` TransferStrategy and to 1 for the `user` one, which supports no
+         other value.
+        """
+        if wallet.token is None:
+            raise errors.ConfigError('Call .setup() on the wallet before coalescing its transactions.')
+        if wallet.token.token_type != TokenType.nowallet:
+            raise errors.UnsupportedOperationError('The token type does not support sending batches.')
+        if wallet._transfer_strategy is TransferStrategy.user:
+            if max_in_flight is not None and max_in_flight > 1:
+                raise errors.ConfigError('Sending batches concurrently requires the brand TransferStrategy.')
+            max_in_flight = 1
+        elif max_in_flight is None:
+            max_in_flight = DEFAULT_MAX_IN_FLIGHT
+
+        self.wallet = wallet
+        self.max_delay = max_delay
+        self.max_batch_size = max_batch_size
+
+        self._windows: Dict[TransactionType, _Window] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._scheduler: threading.Thread = None
+
+    def submit(self, to: str, value: int, tx_type: TransactionType) -> Future:
+        """
+        Queue a call to be sent in the next batch of its type.
+        :param to: receiver, as accepted by :meth:`Wallet.send_transaction <Wallet.send_transaction>`.
+        :param value: amount in wei.
+        :param tx_type: earn, debit or redeem.
+        :return: a Future resolved with the :class:`Transaction <Transaction>` of the batch. Cancelling it before
+         the batch is sent leaves the call out of the batch.
+        """
+        if tx_type not in NOWALLET_BATCH_FUNCTIONS:
+            raise errors.UnsupportedOperationError(f'TransactionType {tx_type} not supported for batches.')
+
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise errors.ConfigError('The BatchCoalescer is closed.')
+            window = self._windows.get(tx_type)
+            if window is None:
+                window = _Window(time.monotonic() + self.max_delay)
+                self._windows[tx_type] = window
+                if self._scheduler is None:
+                    self._scheduler = threading.Thread(target=self.__run, name='qbsdk-coalescer', daemon=True)
+                    self._scheduler.start()
+                self._condition.notify()
+            window.tx_data_list.append(TxData(value, to))
+            window.futures.append(future)
+            if len(window.tx_data_list) >= self.__max_batch_size(tx_type):
+                self.__dispatch(tx_type)
+        return future
+
+    def send_transaction(self, to: str, value: int, tx_type: TransactionType) -> Transaction:
+        """
+        Like :meth:`submit`, waiting for the batch to be sent.
+        :return: :class:`Transaction <Transaction>` of the batch.
+        """
+        return self.submit(to, value, tx_type).result()
+
+    def flush(self):
+        """
+        Send every collected call now, without waiting for its window to close.
+        """
+        with self._condition:
+            for tx_type in list(self._windows):
+                self.__dispatch(tx_type)
+
+    def close(self):
+        """
+        Send the collected calls and wait until every batch has been sent.
+        """
+        with self._condition:
+            self._closed = True
+            for tx_type in list(self._windows):
+                self.__dispatch(tx_type)
+            self._condition.notify()
+        if self._scheduler is not None:
+            self._scheduler.join()
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __max_batch_size(self, tx_type: TransactionType) -> int:
+        if self.max_batch_size is not None:
+            return self.max_batch_size
+        return max(self.wallet.batch_gas_profiles[tx_type].max_items(DEFAULT_GAS), 1)
+
+    def __dispatch(self, tx_type: TransactionType):
+        window = self._windows.pop(tx_type)
+        self._executor.submit(self.__send, tx_type, window)
+
+    def __send(self, tx_type: TransactionType, window: _Window):
+        # calls cancelled by their caller are left out, the others can no longer be cancelled
+        calls = [(tx_data, future) for tx_data, future in zip(window.tx_data_list, window.futures)
+                 if future.set_running_or_notify_cancel()]
+        if len(calls) == 0:
+            return
+
+        log.debug(f'Sending {tx_type.value} batch of {len(calls)} calls')
+        try:
+            transaction = self.wallet.send_batch(list(map(lambda call: call[0], calls)), tx_type)
+        except Exception as e:
+            for _, future in calls:
+                future.set_exception(e)
+            return
+        for _, future in calls:
+            future.set_result(transaction)
+
+    def __run(self):
+        while True:
+            with self._condition:
+                while not self._closed and not self.__has_due():
+                    deadlines = list(map(lambda window: window.deadline, self._windows.values()))
+                    timeout = min(deadlines) - time.monotonic() if len(deadlines) > 0 else None
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+                now = time.monotonic()
+                for tx_type, window in list(self._windows.items()):
+                    if window.deadline <= now:
+                        self.__dispatch(tx_type)
+
+    def __has_due(self) -> bool:
+        now = time.monotonic()
+        return any(map(lambda window: window.deadline <= now, self._windows.values()))
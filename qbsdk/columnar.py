@@ -0,0 +1,100 @@
+"""
+Columnar views of transaction responses for vectorized analytics, built directly from the JSON without
+creating a :class:`Transaction <Transaction>` per row.
+
+Columns:
+
+- `hash`, `from_address`, `to_address`, `contract`: fixed width unicode strings, addresses lower-cased
+- `block_number`, `timestamp`, `transaction_index`, `confirms`: int64, :data:`MISSING_INT` where absent
+  (e.g. pending transactions)
+- `value`: float64 by default, or Python ints (`value_dtype='object'`) when exact amounts are needed
+- `state`: fixed width unicode strings, the :class:`TransactionState <TransactionState>` values
+
+numpy (and pandas for DataFrames) are optional dependencies, install them with `pip install qb-sdk[columnar]`.
+"""
+from typing import Dict, Iterable, List
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MISSING_INT = -1
+
+_INT_COLUMNS = {
+    'block_number': 'blockNumber',
+    'timestamp': 'timestamp',
+    'transaction_index': 'transactionIndex',
+    'confirms': 'confirms'
+}
+
+_ADDRESS_COLUMNS = {
+    'from_address': 'from',
+    'to_address': 'to'
+}
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError('numpy is required for columnar output: pip install qb-sdk[columnar]')
+
+
+def _int_column(json_txs: List[dict], key: str):
+    values = map(lambda json_tx: json_tx.get(key), json_txs)
+    return numpy.fromiter(map(lambda value: MISSING_INT if value is None else value, values),
+                          dtype=numpy.int64, count=len(json_txs))
+
+
+def _str_column(values: Iterable[str]):
+    return numpy.array(list(map(lambda value: '' if value is None else value, values)), dtype=numpy.str_)
+
+
+def transactions_to_columns(json_transactions: Iterable[dict], value_dtype: str = 'float64') -> Dict[str, object]:
+    """
+    :param json_transactions: transactions as returned by the /transactions endpoint.
+    :param value_dtype: `float64` or `object` (exact Python ints).
+    :return: Dict[str, numpy.ndarray] with one entry per column.
+    """
+    _require_numpy()
+    json_txs = json_transactions if isinstance(json_transactions, list) else list(json_transactions)
+
+    columns = {
+        'hash': _str_column(map(lambda json_tx: json_tx['hash'], json_txs))
+    }
+    for column, key in _INT_COLUMNS.items():
+        columns[column] = _int_column(json_txs, key)
+    for column, key in _ADDRESS_COLUMNS.items():
+        columns[column] = _str_column(map(lambda json_tx: (json_tx.get(key) or '').lower(), json_txs))
+    columns['contract'] = _str_column(map(
+        lambda json_tx: (json_tx['contract'] if 'contract' in json_tx else json_tx['contractAddress']).lower(),
+        json_txs))
+
+    if value_dtype == 'object':
+        columns['value'] = numpy.array(list(map(
+            lambda json_tx: int(json_tx['value']) if 'value' in json_tx else None, json_txs)), dtype=object)
+    else:
+        columns['value'] = numpy.fromiter(map(
+            lambda json_tx: float(json_tx['value']) if 'value' in json_tx else numpy.nan, json_txs),
+            dtype=value_dtype, count=len(json_txs))
+
+    columns['state'] = _str_column(map(lambda json_tx: json_tx['state'], json_txs))
+    return columns
+
+
+def transactions_to_dataframe(json_transactions: Iterable[dict], value_dtype: str = 'float64'):
+    """
+    Like :func:`transactions_to_columns`, as a pandas DataFrame. Missing integers are represented by the
+    nullable `Int64` dtype instead of :data:`MISSING_INT`, and `state` is categorical.
+    :return: pandas.DataFrame
+    """
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError('pandas is required for DataFrame output: pip install qb-sdk[columnar]')
+
+    columns = transactions_to_columns(json_transactions, value_dtype=value_dtype)
+    for column in _INT_COLUMNS:
+        values = columns[column]
+        columns[column] = pandas.arrays.IntegerArray(values, values == MISSING_INT)
+    columns['state'] = pandas.Categorical(columns['state'])
+    return pandas.DataFrame(columns)
@@ -0,0 +1,196 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Union
+
+import qbsdk.error as errors
+from qbsdk.api import Api, Transaction, TransactionType
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MIN_INTERVAL = 0.2
+DEFAULT_MAX_INTERVAL = 5.0
+INTERVAL_GROWTH = 1.5
+
+
+class _PendingTransaction:
+    def __init__(self, tx_hash: str, future: Future, interval: float, deadline: float):
+        self.tx_hash = tx_hash
+        self.future = future
+        self.interval = interval
+        self.deadline = deadline
+
+
+class ConfirmationTracker:
+    """
+     Tracks pending transactions until they reach a number of confirmations. A single scheduler thread polls
+     all pending transaction hashes with bounded concurrency, and backs off each hash's polling interval
+     while it remains unconfirmed.
+    """
+
+    def __init__(self, api: Api,
+                 confirms: int = 1,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 min_interval: float = DEFAULT_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL,
+                 timeout: float = None):
+        """
+        :param Api api: instance of API class used to poll transactions.
+        :param int confirms: number of confirmations after which a transaction is considered complete.
+        :param int max_concurrency: maximum number of concurrent polling requests.
+        :param float min_interval: seconds before a newly tracked transaction is first polled.
+        :param float max_interval: upper bound in seconds of the polling interval of a transaction.
+        :param float timeout: (optional) seconds after which a transaction's future fails with a TimeoutError.
+        """
+        self.api = api
+        self.confirms = confirms
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+
+        self._pending: Dict[str, _PendingTransaction] = {}
+        self._schedule: List[tuple] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._scheduler: threading.Thread = None
+
+    def track(self, transaction: Union[Transaction, str]) -> Future:
+        """
+        Start tracking a transaction.
+        :param transaction: a :class:`Transaction <Transaction>` or a transaction hash.
+        :return: a Future resolved with the confirmed :class:`Transaction <Transaction>`.
+        """
+        tx_hash = transaction if isinstance(transaction, str) else transaction.hash
+
+        with self._condition:
+            if self._closed:
+                raise errors.ConfigError('The ConfirmationTracker is closed.')
+            tracked = self._pending.get(tx_hash)
+            if tracked is not None and not tracked.future.done():
+                return tracked.future
+
+            now = time.monotonic()
+            deadline = now + self.timeout if self.timeout is not None else None
+            pending = _PendingTransaction(tx_hash, Future(), self.min_interval, deadline)
+            self._pending[tx_hash] = pending
+            self.__schedule(pending, now + self.min_interval)
+
+            if self._scheduler is None:
+                self._scheduler = threading.Thread(target=self.__run, name='qbsdk-confirmations', daemon=True)
+                self._scheduler.start()
+            self._condition.notify()
+        return pending.future
+
+    def send_transaction(self, wallet, to: str, value: int, tx_type: TransactionType = None) -> Future:
+        """
+        Send a transaction with the given :class:`Wallet <Wallet>` and track it.
+        :return: a Future resolved with the confirmed :class:`Transaction <Transaction>`.
+        """
+        return self.track(wallet.send_transaction(to, value, tx_type=tx_type))
+
+    @property
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def close(self):
+        """
+        Stop polling. Futures of transactions which are still pending are cancelled.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._scheduler is not None:
+            self._scheduler.join()
+        self._executor.shutdown()
+
+        with self._condition:
+            for pending in self._pending.values():
+                pending.future.cancel()
+            self._pending.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __schedule(self, pending: _PendingTransaction, due: float):
+        heapq.heappush(self._schedule, (due, next(self._sequence), pending))
+
+    def __run(self):
+        while True:
+            with self._condition:
+                while not self._closed and not self.__has_due():
+                    timeout = self._schedule[0][0] - time.monotonic() if len(self._schedule) > 0 else None
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+                now = time.monotonic()
+                due = []
+                while len(self._schedule) > 0 and self._schedule[0][0] <= now:
+                    due.append(heapq.heappop(self._schedule)[2])
+
+            try:
+                polled = list(self._executor.map(self.__poll, due))
+            except Exception as e:
+                polled = [(None, e)] * len(due)
+
+            with self._condition:
+                now = time.monotonic()
+                for pending, (transaction, error) in zip(due, polled):
+                    # one failing transaction must not stop the polling of the others
+                    try:
+                        self.__settle(pending, transaction, error, now)
+                    except Exception as e:
+                        log.exception(f'Settling transaction {pending.tx_hash} failed')
+                        self.__finish(pending, error=e)
+
+    def __has_due(self) -> bool:
+        return len(self._schedule) > 0 and self._schedule[0][0] <= time.monotonic()
+
+    def __poll(self, pending: _PendingTransaction) -> tuple:
+        try:
+            return self.api.get_transaction(pending.tx_hash), None
+        except Exception as e:
+            return None, e
+
+    def __settle(self, pending: _PendingTransaction, transaction: Transaction, error: Exception, now: float):
+        if pending.future.done():
+            # cancelled by the caller, stop polling
+            self.__finish(pending)
+            return
+
+        if transaction is not None and transaction.confirms is not None and transaction.confirms >= self.confirms:
+            self.__finish(pending, transaction=transaction)
+            return
+
+        # a not yet indexed transaction is reported as not found, anything else client side is final
+        if isinstance(error, errors.QiibeeError) and not isinstance(error, errors.NotFoundError):
+            self.__finish(pending, error=error)
+            return
+        if error is not None:
+            log.debug(f'Polling transaction {pending.tx_hash} failed: {error}')
+
+        if pending.deadline is not None and now >= pending.deadline:
+            self.__finish(pending, error=TimeoutError(f'Transaction {pending.tx_hash} was not confirmed in time.'))
+            return
+
+        pending.interval = min(pending.interval * INTERVAL_GROWTH, self.max_interval)
+        self.__schedule(pending, now + pending.interval)
+
+    def __finish(self, pending: _PendingTransaction, transaction: Transaction = None, error: Exception = None):
+        if self._pending.get(pending.tx_hash) is pending:
+            del self._pending[pending.tx_hash]
+        if pending.future.done():
+            return
+        if error is not None:
+            pending.future.set_exception(error)
+        else:
+            pending.future.set_result(transaction)
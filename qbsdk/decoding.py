@@ -0,0 +1,84 @@
+import codecs
+import json
+from typing import Callable, Iterable, Iterator
+
+# default decoder of response bodies. orjson is faster on large responses but parses integers above 64 bits, such
+# as token supplies and balances in wei, as floats; pass it explicitly with Api(json_loads=orjson.loads) only if
+# no response holds such values
+loads: Callable[[bytes], object] = json.loads
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[object]:
+    """
+    Incrementally parse a UTF-8 encoded JSON array, yielding each element as soon as it has been received.
+    Only the element being parsed and the unparsed remainder of the last chunk are buffered.
+    :param chunks: the raw body, in chunks of any size.
+    :return: Iterator over the decoded array elements.
+    """
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+    position = 0
+    exhausted = False
+    opened = False
+
+    def read_more() -> bool:
+        nonlocal buffer, position, exhausted
+        if exhausted:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer = buffer[position:] + text_decoder.decode(b'', final=True)
+        else:
+            buffer = buffer[position:] + text_decoder.decode(chunk)
+        position = 0
+        return True
+
+    def next_token() -> str:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not read_more():
+                raise ValueError('Unexpected end of JSON array.')
+
+    while True:
+        token = next_token()
+        if not opened:
+            if token != '[':
+                raise ValueError(f'Expected a JSON array, got {token!r}.')
+            opened = True
+            position += 1
+            if next_token() == ']':
+                return
+            continue
+
+        try:
+            element, end = _decoder.raw_decode(buffer, position)
+        except ValueError:
+            # the element continues in the next chunk
+            if not read_more():
+                raise
+            continue
+        # a number cut off by the end of the buffer (e.g. `1.` of `1.5`) may continue in the next chunk
+        is_number = isinstance(element, (int, float)) and not isinstance(element, bool)
+        if is_number and not exhausted and (end == len(buffer) or buffer[end] not in _DELIMITERS):
+            read_more()
+            continue
+
+        position = end
+        yield element
+
+        token = next_token()
+        position += 1
+        if token == ']':
+            return
+        if token != ',':
+            raise ValueError(f'Expected "," or "]" in JSON array, got {token!r}.')
@@ -20,6 +20,9 @@ class NotFoundError(QiibeeError):
 class ConflictError(QiibeeError):
     pass
 
+class NonceGapError(QiibeeError):
+    pass
+
 class ServerResponseParseError(QiibeeError):
     pass
 
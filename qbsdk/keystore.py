@@ -0,0 +1,207 @@
+"""
+Bulk generation of custodial wallet keys and their storage in an encrypted keystore file, spread over a process
+pool. Deriving addresses and running the key derivation function of every key are CPU bound.
+
+A keystore file holds one Ethereum V3 keystore JSON object per line, each key encrypted with its own salt using
+scrypt or pbkdf2. With the default parameters of eth_account encrypting a key takes around a second of CPU time;
+lower `iterations` trade protection against brute forcing of the password for speed.
+
+On platforms that start worker processes with `spawn` (Windows, macOS) the calling script must guard its entry
+point with `if __name__ == '__main__':`.
+"""
+import collections
+import json
+import os
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+import eth_account
+import eth_keys
+from eth_keys import keys
+from eth_utils import to_checksum_address
+
+DEFAULT_CHUNK_SIZE = 64
+DEFAULT_KDF = 'scrypt'
+
+# (hex encoded private key, checksum address)
+KeyPair = Tuple[str, str]
+
+# per worker process state, set by _init_worker
+_password: str = None
+_kdf: str = None
+_iterations: int = None
+
+
+def _init_worker(password: str = None, kdf: str = None, iterations: int = None):
+    global _password, _kdf, _iterations
+    _password = password
+    _kdf = kdf
+    _iterations = iterations
+
+
+def _generate_key() -> KeyPair:
+    while True:
+        try:
+            private_key = keys.PrivateKey(os.urandom(32))
+        except eth_keys.exceptions.ValidationError:
+            # the 32 random bytes are not a valid secp256k1 key, with negligible probability
+            continue
+        return private_key.to_hex(), private_key.public_key.to_checksum_address()
+
+
+def _generate_chunk(size: int) -> List[KeyPair]:
+    return [_generate_key() for _ in range(size)]
+
+
+def _encrypt(key_pair: KeyPair) -> str:
+    return json.dumps(eth_account.Account.encrypt(key_pair[0], _password, kdf=_kdf, iterations=_iterations))
+
+
+def _encrypt_chunk(key_pairs: List[KeyPair]) -> List[str]:
+    return list(map(_encrypt, key_pairs))
+
+
+def _create_chunk(size: int) -> List[Tuple[str, str]]:
+    return [(key_pair[1], _encrypt(key_pair)) for key_pair in _generate_chunk(size)]
+
+
+def _decrypt_chunk(lines: List[str]) -> List[KeyPair]:
+    key_pairs = []
+    for line in lines:
+        keyfile_json = json.loads(line)
+        private_key = keys.PrivateKey(eth_account.Account.decrypt(keyfile_json, _password))
+        # the MAC only covers the ciphertext, the address field of the file is not authenticated
+        address = private_key.public_key.to_checksum_address()
+        if keyfile_json.get('address') is not None and to_checksum_address(keyfile_json['address']) != address:
+            # ValueError like eth_account's MAC mismatch, QiibeeError can not be sent back from a worker process
+            raise ValueError(f'Keystore address {keyfile_json["address"]} does not match its key, '
+                             f'which belongs to {address}')
+        key_pairs.append((private_key.to_hex(), address))
+    return key_pairs
+
+
+def _chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if len(chunk) > 0:
+        yield chunk
+
+
+def _sizes(count: int, chunk_size: int) -> Iterator[int]:
+    for offset in range(0, count, chunk_size):
+        yield min(chunk_size, count - offset)
+
+
+def _map_chunks(function: Callable[[object], list], chunks: Iterable, processes: int,
+                initargs: tuple = ()) -> Iterator:
+    """
+    Apply `function` to every chunk in a process pool and yield the results of each chunk in order.
+    Unlike Executor.map, the chunks are consumed lazily: only a few chunks per process are queued at once.
+    """
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        _init_worker(*initargs)
+        try:
+            for chunk in chunks:
+                yield from function(chunk)
+        finally:
+            _init_worker()
+        return
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=initargs) as executor:
+        yield from _ordered_results(executor, function, chunks, 2 * processes)
+
+
+def _ordered_results(executor: Executor, function: Callable[[object], list], chunks: Iterable,
+                     max_pending: int) -> Iterator:
+    pending = collections.deque()
+    for chunk in chunks:
+        pending.append(executor.submit(function, chunk))
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+    while len(pending) > 0:
+        yield from pending.popleft().result()
+
+
+def _write_lines(path: str, lines: Iterable[str]) -> int:
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.qbsdk-keystore-', suffix='.tmp')
+    count = 0
+    try:
+        with os.fdopen(file_descriptor, 'w') as temporary_file:
+            for line in lines:
+                temporary_file.write(line + '\n')
+                count += 1
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    return count
+
+
+def generate_keys(count: int, processes: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[KeyPair]:
+    """
+    Generate random private keys and derive their addresses, without creating a :class:`Wallet <Wallet>` each.
+    :param int count: number of keys.
+    :param int processes: (optional) number of worker processes, defaults to the number of CPUs.
+    :param int chunk_size: number of keys a worker generates per task.
+    :return: Iterator over (hex encoded private key, checksum address) pairs, produced as they are generated.
+    """
+    return _map_chunks(_generate_chunk, _sizes(count, chunk_size), processes)
+
+
+def write_keystore(path: str, key_pairs: Iterable[KeyPair], password: str, kdf: str = DEFAULT_KDF,
+                   iterations: int = None, processes: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Encrypt keys in parallel and write them to a keystore file, in order. The file is only replaced once all keys
+    are written.
+    :param str path: keystore file.
+    :param key_pairs: (hex encoded private key, checksum address) pairs, e.g. from :func:`generate_keys`.
+    :param str password: password every key is encrypted with.
+    :param str kdf: `scrypt` or `pbkdf2`.
+    :param int iterations: (optional) work factor of the kdf, defaults to eth_account's.
+    :param int processes: (optional) number of worker processes, defaults to the number of CPUs.
+    :param int chunk_size: number of keys a worker encrypts per task.
+    :return: the number of keys written.
+    """
+    lines = _map_chunks(_encrypt_chunk, _chunks(key_pairs, chunk_size), processes, (password, kdf, iterations))
+    return _write_lines(path, lines)
+
+
+def create_keystore(path: str, count: int, password: str, kdf: str = DEFAULT_KDF, iterations: int = None,
+                    processes: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[str]:
+    """
+    Generate keys and write them encrypted to a keystore file. Each key is generated and encrypted by the same
+    worker and never sent to the calling process.
+    Parameters are those of :func:`write_keystore`.
+    :return: the checksum addresses of the generated keys, in file order.
+    """
+    addresses = []
+
+    def lines() -> Iterator[str]:
+        for address, line in _map_chunks(_create_chunk, _sizes(count, chunk_size), processes,
+                                         (password, kdf, iterations)):
+            addresses.append(address)
+            yield line
+
+    _write_lines(path, lines())
+    return addresses
+
+
+def read_keystore(path: str, password: str, processes: int = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[KeyPair]:
+    """
+    Decrypt the keys of a keystore file in parallel.
+    :param str path: keystore file written by :func:`write_keystore` or :func:`create_keystore`.
+    :param str password: password the keys were encrypted with.
+    :return: Iterator over (hex encoded private key, checksum address) pairs, in file order. The address is derived
+     from the decrypted key; a ValueError is raised if a line's address field does not match it.
+    """
+    with open(path, 'r') as keystore_file:
+        lines = filter(lambda line: len(line) > 0, map(str.strip, keystore_file))
+        yield from _map_chunks(_decrypt_chunk, _chunks(lines, chunk_size), processes, (password,))
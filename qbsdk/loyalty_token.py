@@ -593,8 +593,17 @@ __no_wallet_loyalty_token_abi_json = """
   ]
 """
 
-abi = json.loads(__loyalty_token_abi_json)
+# the ABIs are only parsed on first access, `abi` and `no_wallet_abi` are not needed to use the Api
+__abi_json = {
+    'abi': __loyalty_token_abi_json,
+    'no_wallet_abi': __no_wallet_loyalty_token_abi_json
+}
 
-no_wallet_abi = json.loads(__no_wallet_loyalty_token_abi_json)
 
+def __getattr__(attribute):
+    if attribute not in __abi_json:
+        raise AttributeError(f'module {__name__!r} has no attribute {attribute!r}')
+    value = json.loads(__abi_json[attribute])
+    globals()[attribute] = value
+    return value
 
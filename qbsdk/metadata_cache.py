@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict
+
+log = logging.getLogger(__name__)
+
+# bump whenever the layout of the file or of the cached values changes, files of other versions are ignored
+FORMAT_VERSION = 1
+
+DEFAULT_TTL = 3600
+
+
+class MetadataCache:
+    """
+     Cache of rarely changing chain metadata (token records and the chain id) in a JSON file, so that it survives
+     process restarts. Values are kept per :class:`Mode <Mode>`. A value older than `ttl` seconds is revalidated
+     against the API, but still returned if the API cannot be reached.
+     The file is replaced atomically, several processes may share it.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.time):
+        """
+        :param str path: location of the cache file. It is created on the first write.
+        :param float ttl: seconds after which a cached value is fetched again.
+        :param clock: returns the current time in seconds since the epoch.
+        """
+        self.path = path
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._modes: Dict[str, dict] = None
+
+    def get(self, mode, key: str, stale: bool = False):
+        """
+        :param Mode mode: environment the value belongs to.
+        :param str key: name of the value.
+        :param bool stale: if True, also return a value older than the TTL.
+        :return: the cached JSON value, or None.
+        """
+        with self._lock:
+            if self._modes is None:
+                self._modes = self.__read()
+            entry = self._modes.get(mode.value, {}).get(key)
+        if entry is None or (not stale and self._clock() - entry['fetched_at'] >= self.ttl):
+            return None
+        return entry['value']
+
+    def set(self, mode, key: str, value):
+        """
+        Store a JSON serializable value and write the file.
+        """
+        with self._lock:
+            # merge with what other processes may have written in the meantime
+            self._modes = self.__read()
+            self._modes.setdefault(mode.value, {})[key] = {'value': value, 'fetched_at': self._clock()}
+            self.__write(self._modes)
+
+    def invalidate(self):
+        """
+        Drop every cached value and delete the file.
+        """
+        with self._lock:
+            self._modes = {}
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __read(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, 'r') as cache_file:
+                content = json.load(cache_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.warning(f'Ignoring unreadable metadata cache {self.path}: {e}')
+            return {}
+        if not isinstance(content, dict) or content.get('version') != FORMAT_VERSION:
+            log.info(f'Ignoring metadata cache {self.path} written in another format version')
+            return {}
+        return content.get('modes', {})
+
+    def __write(self, modes: Dict[str, dict]):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.qbsdk-metadata-', suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'w') as temporary_file:
+                json.dump({'version': FORMAT_VERSION, 'modes': modes}, temporary_file)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
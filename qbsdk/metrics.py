@@ -0,0 +1,283 @@
+"""
+Instrumentation of the requests made by an :class:`Api <Api>`. Observers given to the Api receive a
+:class:`RequestMetrics` after every request:
+
+    histogram = HistogramAggregator()
+    api = Api(api_key, observers=[histogram])
+    ...
+    histogram.summary()['POST /transactions/']['p95']
+
+DNS resolution and connection setup are not reported separately: requests does not expose them, and they are
+included in `ttfb_seconds`, the time from sending the request until its response headers were parsed.
+
+:class:`SendTimings` break a :meth:`Wallet.send_transaction <Wallet.send_transaction>` or `send_batch` call down
+into stages, and :class:`SendStatistics` accumulates them per wallet.
+"""
+import collections
+import logging
+import math
+import threading
+import time
+from typing import Callable, Deque, Dict, List
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_SAMPLES = 10000
+
+# stages of a send, in the order they happen
+SEND_STAGES = ('nonce', 'raw_transaction', 'build', 'sign', 'post', 'backoff')
+
+
+class RequestMetrics:
+    __slots__ = ('endpoint', 'method', 'status_code', 'request_bytes', 'response_bytes', 'ttfb_seconds',
+                 'total_seconds', 'retries', 'started_at', 'error')
+
+    def __init__(self, endpoint: str, method: str, status_code: int = None, request_bytes: int = 0,
+                 response_bytes: int = 0, ttfb_seconds: float = None, total_seconds: float = None, retries: int = 0,
+                 started_at: float = None, error: Exception = None):
+        # path with its variable parts as placeholders, e.g. `/transactions/{hash}`
+        self.endpoint: str = endpoint
+        self.method: str = method
+        # None if no response was received, see `error`
+        self.status_code: int = status_code
+        self.request_bytes: int = request_bytes
+        self.response_bytes: int = response_bytes
+        self.ttfb_seconds: float = ttfb_seconds
+        self.total_seconds: float = total_seconds
+        # retries made by the transport adapter (urllib3), not by the SDK
+        self.retries: int = retries
+        # time.time() when the request was sent
+        self.started_at: float = started_at
+        # exception raised while sending the request or receiving a streamed body, not for error status codes
+        self.error: Exception = error
+
+    @property
+    def key(self) -> str:
+        return f'{self.method} {self.endpoint}'
+
+
+class RequestObserver:
+    """
+     Receives the metrics of every request. Called on the thread that made the request, so implementations must be
+     thread safe and fast. Exceptions raised by an observer are logged and otherwise ignored.
+    """
+
+    def on_request(self, metrics: RequestMetrics):
+        raise NotImplementedError
+
+
+def notify(observers: List[RequestObserver], metrics: RequestMetrics):
+    for observer in observers:
+        try:
+            observer.on_request(metrics)
+        except Exception:
+            log.exception(f'Request observer {observer!r} failed')
+
+
+class CallbackObserver(RequestObserver):
+    """
+     Adapts a function taking :class:`RequestMetrics` to the observer interface.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def on_request(self, metrics: RequestMetrics):
+        self.callback(metrics)
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    # nearest rank
+    if len(sorted_values) == 0:
+        return None
+    rank = max(math.ceil(percentile / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class _Series:
+    def __init__(self, max_samples: int):
+        self.count = 0
+        self.errors = 0
+        self.response_bytes = 0
+        self.samples: Deque[float] = collections.deque(maxlen=max_samples)
+
+
+class HistogramAggregator(RequestObserver):
+    """
+     Keeps the total time of the most recent requests per method and endpoint, and reports their percentiles.
+    """
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES):
+        """
+        :param int max_samples: number of most recent requests per endpoint the percentiles are computed from.
+        """
+        self.max_samples = max_samples
+        self._series: Dict[str, _Series] = {}
+        self._lock = threading.Lock()
+
+    def on_request(self, metrics: RequestMetrics):
+        with self._lock:
+            series = self._series.get(metrics.key)
+            if series is None:
+                series = _Series(self.max_samples)
+                self._series[metrics.key] = series
+            series.count += 1
+            series.response_bytes += metrics.response_bytes
+            if metrics.error is not None or metrics.status_code is None or metrics.status_code >= 400:
+                series.errors += 1
+            series.samples.append(metrics.total_seconds)
+
+    def percentile(self, key: str, percentile: float) -> float:
+        """
+        :param str key: method and endpoint, e.g. `GET /addresses/{address}/nextnonce`.
+        :param float percentile: between 0 and 100.
+        :return: the total time in seconds, or None if there was no request.
+        """
+        with self._lock:
+            series = self._series.get(key)
+            samples = sorted(series.samples) if series is not None else []
+        return _percentile(samples, percentile)
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        :return: per method and endpoint the request and error counts, received bytes, and the mean, p50, p95,
+         p99 and maximum total time in seconds.
+        """
+        with self._lock:
+            series_by_key = {key: (series.count, series.errors, series.response_bytes, sorted(series.samples))
+                             for key, series in self._series.items()}
+
+        summary = {}
+        for key, (count, errors, response_bytes, samples) in series_by_key.items():
+            summary[key] = {
+                'count': count,
+                'errors': errors,
+                'response_bytes': response_bytes,
+                'mean': sum(samples) / len(samples),
+                'p50': _percentile(samples, 50),
+                'p95': _percentile(samples, 95),
+                'p99': _percentile(samples, 99),
+                'max': samples[-1]
+            }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class OpenTelemetryObserver(RequestObserver):
+    """
+     Records a client span per request with OpenTelemetry, as a child of the span current on the requesting thread.
+     Requires the opentelemetry-api package: `pip install qb-sdk[opentelemetry]`.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        :param tracer: (optional) OpenTelemetry tracer, defaults to the global tracer provider's.
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError('opentelemetry-api is required for tracing: pip install qb-sdk[opentelemetry]')
+        self._trace = trace
+        self.tracer = tracer if tracer is not None else trace.get_tracer('qbsdk')
+
+    def on_request(self, metrics: RequestMetrics):
+        started_at_ns = int(metrics.started_at * 1e9)
+        span = self.tracer.start_span(f'qiibee {metrics.key}', kind=self._trace.SpanKind.CLIENT,
+                                      start_time=started_at_ns)
+        span.set_attribute('http.method', metrics.method)
+        span.set_attribute('http.route', metrics.endpoint)
+        span.set_attribute('http.request_content_length', metrics.request_bytes)
+        span.set_attribute('http.response_content_length', metrics.response_bytes)
+        span.set_attribute('http.retry_count', metrics.retries)
+        if metrics.status_code is not None:
+            span.set_attribute('http.status_code', metrics.status_code)
+        if metrics.ttfb_seconds is not None:
+            span.set_attribute('qbsdk.ttfb_ms', metrics.ttfb_seconds * 1e3)
+        if metrics.error is not None:
+            span.record_exception(metrics.error)
+        if metrics.error is not None or metrics.status_code is None or metrics.status_code >= 400:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end(end_time=started_at_ns + int(metrics.total_seconds * 1e9))
+
+
+class SendTimings:
+    """
+     Seconds spent per stage by one send, summed over its retries:
+     `nonce` fetching or allocating nonces (brand strategy), `raw_transaction` fetching the unsigned transaction
+     (user strategy), `build` encoding the contract call, `sign` signing, `post` posting the signed transaction and
+     `backoff` sleeping between retries after a conflict.
+    """
+    __slots__ = ('operation', 'nonce', 'raw_transaction', 'build', 'sign', 'post', 'backoff', 'total',
+                 'conflict_retries', 'failed')
+
+    def __init__(self, operation: str):
+        # `send_transaction` or `send_batch`
+        self.operation: str = operation
+        self.nonce: float = 0.0
+        self.raw_transaction: float = 0.0
+        self.build: float = 0.0
+        self.sign: float = 0.0
+        self.post: float = 0.0
+        self.backoff: float = 0.0
+        self.total: float = 0.0
+        # number of times the send was retried after a 409 nonce conflict
+        self.conflict_retries: int = 0
+        self.failed: bool = False
+
+    def time(self, stage: str, function: Callable, *args):
+        """
+        Call `function` with `args` and add its duration to `stage`.
+        :return: the return value of `function`.
+        """
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            setattr(self, stage, getattr(self, stage) + time.perf_counter() - started)
+
+    def stages(self) -> Dict[str, float]:
+        return {stage: getattr(self, stage) for stage in SEND_STAGES}
+
+
+class SendStatistics:
+    """
+     Cumulative :class:`SendTimings` of the sends of a wallet. Thread safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def add(self, timings: SendTimings):
+        with self._lock:
+            self._sends += 1
+            self._failures += int(timings.failed)
+            self._conflict_retries += timings.conflict_retries
+            self._total_seconds += timings.total
+            for stage in SEND_STAGES:
+                self._stage_seconds[stage] += getattr(timings, stage)
+
+    def snapshot(self) -> dict:
+        """
+        :return: the number of sends, failed sends and 409 conflict retries, and the total seconds spent overall
+         and per stage. `stage_seconds['backoff']` is the total time slept between retries.
+        """
+        with self._lock:
+            return {
+                'sends': self._sends,
+                'failures': self._failures,
+                'conflict_retries': self._conflict_retries,
+                'total_seconds': self._total_seconds,
+                'stage_seconds': dict(self._stage_seconds)
+            }
+
+    def reset(self):
+        with self._lock:
+            self._sends = 0
+            self._failures = 0
+            self._conflict_retries = 0
+            self._total_seconds = 0.0
+            self._stage_seconds = {stage: 0.0 for stage in SEND_STAGES}
@@ -0,0 +1,42 @@
+import logging
+import threading
+from typing import Callable
+
+log = logging.getLogger(__name__)
+
+
+class NonceManager:
+    """
+     Allocates transaction nonces for a single address locally. The next nonce is fetched once and then
+     incremented in-process, so concurrent senders sharing the manager never receive the same nonce.
+     Call :meth:`resync` whenever a nonce may not have been consumed on chain (a conflict or a failed send),
+     the next allocation then refetches it.
+    """
+
+    def __init__(self, fetch_next_nonce: Callable[[], int]):
+        """
+        :param fetch_next_nonce: returns the next unused nonce of the address as known by the blockchain.
+        """
+        self._fetch_next_nonce = fetch_next_nonce
+        self._lock = threading.Lock()
+        self._next_nonce: int = None
+
+    def allocate(self) -> int:
+        """
+        Reserve the next nonce. Only the first allocation after a (re)sync does I/O.
+        :return: the reserved nonce
+        """
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = self._fetch_next_nonce()
+                log.debug(f'Synced next nonce: {self._next_nonce}')
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def resync(self):
+        """
+        Drop the locally tracked nonce so that the next allocation refetches it.
+        """
+        with self._lock:
+            self._next_nonce = None
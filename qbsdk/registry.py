@@ -0,0 +1,84 @@
+import logging
+import threading
+from typing import Dict, Tuple
+
+import web3
+from web3 import Web3
+
+from qbsdk.api import Api, Token, TokenType
+from qbsdk.builder import TransactionBuilder
+
+log = logging.getLogger(__name__)
+
+
+class SharedContract:
+    """
+     The Web3 connection, contract object and transaction builder of one loyalty token contract on one chain.
+     Holds no key, so it can be used by any number of wallets.
+    """
+
+    def __init__(self, token_type: TokenType, contract_address: str, chain_id: int):
+        self.transaction_builder = TransactionBuilder(token_type, contract_address, chain_id)
+        self.web3_connection = Web3()
+        self.contract: web3.contract.Contract = self.web3_connection.eth.contract(
+            abi=self.transaction_builder.abi, address=self.transaction_builder.contract_address)
+
+
+class ContractRegistry:
+    """
+     Process-wide cache of what :meth:`Wallet.setup <Wallet.setup>` needs, shared by every wallet set up with it:
+     the tokens and chain id of each API host, fetched once, and a :class:`SharedContract <SharedContract>` per
+     contract address, token type and chain id.
+    """
+
+    def __init__(self):
+        self._tokens: Dict[str, Dict[str, Token]] = {}
+        self._chain_ids: Dict[str, int] = {}
+        self._contracts: Dict[Tuple[TokenType, str, int], SharedContract] = {}
+        # held while fetching, so that wallets set up concurrently wait for a single request
+        self._lock = threading.RLock()
+
+    def get_token(self, api: Api, symbol: str) -> Token:
+        """
+        :return: the private token with the given symbol, or None if it does not exist. The tokens of the
+         API host are fetched on first use only.
+        """
+        with self._lock:
+            tokens = self._tokens.get(api.api_host)
+            if tokens is None:
+                log.debug(f'Fetching tokens of {api.api_host} for the registry')
+                tokens = {token.symbol: token for token in api._get_private_tokens()}
+                self._tokens[api.api_host] = tokens
+            return tokens.get(symbol)
+
+    def get_chain_id(self, api: Api) -> int:
+        """
+        :return: the chain id of the API host, fetched on first use only.
+        """
+        with self._lock:
+            chain_id = self._chain_ids.get(api.api_host)
+            if chain_id is None:
+                chain_id = api._get_chain_id()
+                self._chain_ids[api.api_host] = chain_id
+            return chain_id
+
+    def get_contract(self, token: Token, chain_id: int) -> SharedContract:
+        key = (token.token_type, token.contract_address.lower(), chain_id)
+        with self._lock:
+            contract = self._contracts.get(key)
+            if contract is None:
+                contract = SharedContract(*key)
+                self._contracts[key] = contract
+            return contract
+
+    def clear(self):
+        """
+        Drop everything, e.g. after a token was created. Wallets already set up keep what they were given.
+        """
+        with self._lock:
+            self._tokens.clear()
+            self._chain_ids.clear()
+            self._contracts.clear()
+
+
+default_registry = ContractRegistry()
@@ -0,0 +1,50 @@
+from typing import Union
+
+import eth_account
+import rlp
+from eth_keys import keys
+from eth_utils import decode_hex, keccak
+
+# fields of a legacy transaction, in RLP order
+_FIELDS = ('nonce', 'gasPrice', 'gas', 'to', 'value', 'data')
+
+
+class TransactionSigner:
+    """
+     Signs transactions with a private key that is parsed once. Transactions built by the Wallet (integer fields,
+     hex `to` and `data`, integer `chainId`) are RLP encoded and signed directly following EIP-155, which skips the
+     generic validation and key parsing eth_account repeats for every signature. Any other transaction dict is
+     signed by eth_account.
+    """
+
+    def __init__(self, private_key: Union[str, keys.PrivateKey]):
+        """
+        :param private_key: hex encoded private key, or an already parsed one.
+        """
+        if isinstance(private_key, keys.PrivateKey):
+            self._private_key = private_key
+        else:
+            self._private_key = keys.PrivateKey(decode_hex(private_key))
+
+    def sign(self, transaction: dict) -> str:
+        """
+        :param transaction: transaction dict as built by web3's buildTransaction.
+        :return: the 0x prefixed hex encoding of the signed transaction.
+        """
+        if not self.__is_prebuilt(transaction):
+            signed_tx = eth_account.Account.sign_transaction(transaction, self._private_key)
+            return signed_tx.rawTransaction.hex()
+
+        chain_id = transaction['chainId']
+        fields = [transaction['nonce'], transaction['gasPrice'], transaction['gas'],
+                  decode_hex(transaction['to']), transaction['value'], decode_hex(transaction['data'])]
+        signature = self._private_key.sign_msg_hash(keccak(rlp.encode(fields + [chain_id, 0, 0])))
+        v = signature.v + 35 + 2 * chain_id
+        return '0x' + rlp.encode(fields + [v, signature.r, signature.s]).hex()
+
+    @staticmethod
+    def __is_prebuilt(transaction: dict) -> bool:
+        if len(transaction) != len(_FIELDS) + 1 or not isinstance(transaction.get('chainId'), int):
+            return False
+        return all(map(lambda field: isinstance(transaction.get(field), str if field in ('to', 'data') else int),
+                       _FIELDS))
@@ -0,0 +1,463 @@
+"""
+In-process stand-in for the qiibee API, to exercise the SDK (and load test code built on it) offline.
+
+The :class:`Simulator` keeps an in-memory chain state and answers the requests of an :class:`Api <Api>` through a
+requests transport adapter mounted on the Api's session, so no socket is opened:
+
+    simulator = Simulator(latency=0.02, confirmation_delay=1.0)
+    token = simulator.add_token('SIM', owner=brand_address)
+    api = simulator.api(api_key='secret')
+
+Implemented endpoints: /tokens, /tokens/{contract}, /transactions, /transactions/{hash}, /transactions/raw,
+POST /transactions/, /addresses/{address}, /addresses/{address}/nextnonce, /net, /prices and /prices/history.
+
+Posted transactions are RLP decoded and their EIP-155 signature is verified. A nonce lower than the sender's next
+nonce, or already used by a queued transaction, is rejected with 409. A transaction with a higher nonce is queued
+until the gap is filled, like a node's transaction pool does. Accepted transactions stay pending for
+`confirmation_delay` seconds and then gain one confirmation per `block_time`.
+"""
+import datetime
+import itertools
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Union
+from urllib.parse import parse_qs, urlsplit
+
+import eth_abi
+import eth_account
+import rlp
+import requests
+from eth_utils import keccak, to_checksum_address
+from requests.adapters import BaseAdapter
+
+import qbsdk.error as errors
+import qbsdk.loyalty_token as loyalty_token
+from qbsdk.api import Api, Mode, TokenType, TransactionType
+from qbsdk.builder import TransactionBuilder
+from qbsdk.calldata import FunctionEncoder
+
+DEFAULT_CHAIN_ID = 1515
+DEFAULT_BLOCK_TIME = 1.0
+DEFAULT_PRICES = {'EUR': '0.1', 'USD': '0.11', 'CHF': '0.11'}
+
+_decode_abi = getattr(eth_abi, 'decode_abi', None) or eth_abi.decode
+
+# functions of both loyalty token ABIs by selector, with how each one changes balances
+_CREDIT_FUNCTIONS = ('earn', 'earnBatch')
+_DEBIT_FUNCTIONS = ('debit', 'redeem', 'debitBatch', 'redeemBatch')
+
+
+def _selectors() -> Dict[bytes, FunctionEncoder]:
+    functions = {}
+    for abi in (loyalty_token.abi, loyalty_token.no_wallet_abi):
+        for abi_function in abi:
+            if abi_function.get('type') == 'function':
+                function = FunctionEncoder(abi_function)
+                functions[function.selector] = function
+    return functions
+
+
+def _holder(value) -> str:
+    # receivers are addresses for wallet tokens and bytes32 user ids for nowallet tokens
+    return '0x' + value.hex() if isinstance(value, bytes) else value.lower()
+
+
+class SimulatorError(Exception):
+    def __init__(self, status_code: int, message: str):
+        self.status_code = status_code
+        self.message = message
+
+
+class Simulator:
+    """
+     In-memory qiibee API. All methods are thread safe.
+    """
+
+    def __init__(self,
+                 chain_id: int = DEFAULT_CHAIN_ID,
+                 latency: Union[float, Callable[[], float]] = 0.0,
+                 confirmation_delay: float = 0.0,
+                 block_time: float = DEFAULT_BLOCK_TIME,
+                 api_key: str = None,
+                 prices: Dict[str, str] = None,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        :param int chain_id: chain id reported by /net and required in the signatures of posted transactions.
+        :param latency: seconds every request takes, or a function returning them (e.g. to add jitter).
+        :param float confirmation_delay: seconds an accepted transaction stays pending.
+        :param float block_time: seconds per block, a processed transaction gains a confirmation per block.
+        :param str api_key: (optional) if set, /nextnonce requires it as bearer token.
+        :param dict prices: FIAT price per currency symbol returned by /prices.
+        :param clock: returns the current time in seconds since the epoch.
+        :param sleep: used to simulate latency.
+        """
+        self.chain_id = chain_id
+        self.latency = latency
+        self.confirmation_delay = confirmation_delay
+        self.block_time = block_time
+        self.api_key = api_key
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self._clock = clock
+        self._sleep = sleep
+        self._started_at = clock()
+
+        self._lock = threading.RLock()
+        self._tokens: Dict[str, dict] = {}
+        self._builders: Dict[str, TransactionBuilder] = {}
+        self._balances: Dict[tuple, int] = {}
+        self._next_nonces: Dict[str, int] = {}
+        self._queued: Dict[str, Dict[int, dict]] = {}
+        self._transactions: Dict[str, dict] = {}
+        self._history: List[dict] = []
+        self._index = itertools.count()
+        self._functions = _selectors()
+        self.request_count = 0
+        self.conflict_count = 0
+
+    # chain state
+
+    def add_token(self, symbol: str, token_type: TokenType = TokenType.nowallet, owner: str = None,
+                  total_supply: int = 10 ** 27, contract_address: str = None, name: str = None,
+                  decimals: int = 18, rate: int = 1, description: str = '') -> dict:
+        """
+        Create a private token. Its whole supply belongs to `owner`, if given.
+        :return: the token in the format of the API, accepted by :class:`Token <Token>`.
+        """
+        with self._lock:
+            if contract_address is None:
+                contract_address = '0x' + keccak(text=f'qbsdk-simulator-{symbol}-{len(self._tokens)}')[-20:].hex()
+            contract_address = to_checksum_address(contract_address)
+            token = {
+                'contractAddress': contract_address,
+                'decimals': decimals,
+                'description': description,
+                'name': name if name is not None else symbol,
+                'rate': rate,
+                'symbol': symbol,
+                'totalSupply': total_supply,
+                'tokenType': token_type.value
+            }
+            self._tokens[contract_address.lower()] = token
+            self._builders[contract_address.lower()] = TransactionBuilder(token_type, contract_address,
+                                                                          self.chain_id)
+            if owner is not None:
+                self._balances[(contract_address.lower(), owner.lower())] = total_supply
+            return token
+
+    def balance_of(self, contract_address: str, holder: str) -> int:
+        with self._lock:
+            return self._balances.get((contract_address.lower(), holder.lower()), 0)
+
+    def next_nonce(self, address: str) -> int:
+        with self._lock:
+            return self._next_nonces.get(address.lower(), 0)
+
+    @property
+    def transaction_count(self) -> int:
+        """
+        Number of accepted transactions, including queued ones.
+        """
+        with self._lock:
+            return len(self._transactions)
+
+    # transport
+
+    def install(self, api: Api):
+        """
+        Route every request of `api` to this simulator.
+        """
+        api._session.mount(api.api_host, SimulatorAdapter(self))
+        return api
+
+    def api(self, api_key: str = None, mode: Mode = Mode.sandbox, **api_args) -> Api:
+        """
+        :return: a new :class:`Api <Api>` connected to this simulator. Other arguments are passed to it.
+        """
+        return self.install(Api(api_key if api_key is not None else self.api_key, mode=mode, **api_args))
+
+    def handle(self, method: str, url: str, headers: dict, body) -> tuple:
+        """
+        :return: (status code, JSON response) of a request.
+        """
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency > 0:
+            self._sleep(latency)
+
+        with self._lock:
+            self.request_count += 1
+
+        split_url = urlsplit(url)
+        params = {name: values[-1] for name, values in parse_qs(split_url.query).items()}
+        parts = [part for part in split_url.path.split('/') if part != '']
+        try:
+            # decoded and verified before taking the lock, recovering the signer is the expensive part
+            transaction = self.__decode_transaction(body) if method == 'POST' and parts == ['transactions'] else None
+            with self._lock:
+                return 200, self.__route(method, parts, params, headers, transaction)
+        except SimulatorError as e:
+            if e.status_code == 409:
+                with self._lock:
+                    self.conflict_count += 1
+            return e.status_code, {'message': e.message}
+
+    def __route(self, method: str, parts: List[str], params: dict, headers: dict, transaction: dict):
+        if transaction is not None:
+            return self.__post_transaction(transaction)
+        if method != 'GET':
+            raise SimulatorError(404, f'Cannot {method} /{"/".join(parts)}')
+
+        if parts == ['tokens']:
+            return {'private': list(self._tokens.values()), 'public': []}
+        if len(parts) == 2 and parts[0] == 'tokens':
+            return {'private': self.__token(parts[1])}
+        if parts == ['transactions']:
+            return self.__transactions(params)
+        if parts == ['transactions', 'raw']:
+            return self.__raw_transaction(params)
+        if len(parts) == 2 and parts[0] == 'transactions':
+            transaction = self._transactions.get(parts[1].lower())
+            if transaction is None:
+                raise SimulatorError(404, f'Transaction {parts[1]} not found.')
+            return self.__transaction_json(transaction)
+        if len(parts) == 2 and parts[0] == 'addresses':
+            return self.__address(parts[1])
+        if len(parts) == 3 and parts[0] == 'addresses' and parts[2] == 'nextnonce':
+            if self.api_key is not None and headers.get('Authorization') != f'Bearer {self.api_key}':
+                raise SimulatorError(403, 'Invalid API key.')
+            return {'result': hex(self._next_nonces.get(parts[1].lower(), 0))}
+        if parts == ['net']:
+            return self.__block()
+        if parts == ['prices']:
+            self.__token(params.get('from', ''))
+            symbols = params['to'].split(',') if 'to' in params else list(self.prices)
+            return {symbol: self.prices[symbol] for symbol in symbols if symbol in self.prices}
+        if parts == ['prices', 'history']:
+            self.__token(params.get('from', ''))
+            price = float(self.prices.get(params.get('to'), 0))
+            now = int(self._clock())
+            return [{'time': now - 86400 * day, 'price': price} for day in range(int(params.get('limit', 30)))]
+        raise SimulatorError(404, f'Not found: /{"/".join(parts)}')
+
+    # endpoints
+
+    def __token(self, contract_address: str) -> dict:
+        token = self._tokens.get(contract_address.lower())
+        if token is None:
+            raise SimulatorError(404, f'Token {contract_address} not found.')
+        return token
+
+    def __raw_transaction(self, params: dict) -> dict:
+        token = self.__token(params.get('contractAddress', ''))
+        builder = self._builders[token['contractAddress'].lower()]
+        tx_type = TransactionType(params.get('txType', TransactionType.transfer.value))
+        try:
+            raw_tx = builder.build(params['to'], int(params['transferAmount']),
+                                   self._next_nonces.get(params['from'].lower(), 0), tx_type)
+        except (errors.QiibeeError, ValueError, KeyError) as e:
+            raise SimulatorError(400, f'Invalid raw transaction parameters: {getattr(e, "message", e)}')
+        raw_tx['gasLimit'] = raw_tx.pop('gas')
+        return raw_tx
+
+    def __transactions(self, params: dict) -> List[dict]:
+        wallet = params.get('wallet', '').lower()
+        contract_address = params.get('contractAddress', '').lower()
+        symbol = params.get('symbol')
+        offset = int(params.get('offset', 0))
+        limit = int(params.get('limit', 100))
+
+        def matches(transaction: dict) -> bool:
+            if wallet and wallet not in (transaction['from'].lower(), transaction['to'].lower()):
+                return False
+            if contract_address and transaction['contract'].lower() != contract_address:
+                return False
+            return symbol is None or self._tokens[transaction['contract'].lower()]['symbol'] == symbol
+
+        # newest first, pending transactions are the newest
+        selected = [transaction for transaction in reversed(self._history) if matches(transaction)]
+        return list(map(self.__transaction_json, selected[offset:offset + limit]))
+
+    def __address(self, address: str) -> dict:
+        private = {}
+        for contract_address, token in self._tokens.items():
+            balance = self._balances.get((contract_address, address.lower()))
+            if balance is not None:
+                private[token['symbol']] = {'balance': str(balance), 'contractAddress': token['contractAddress']}
+        return {'transactionCount': self._next_nonces.get(address.lower(), 0), 'balances': {'private': private}}
+
+    def __block(self) -> dict:
+        number = self.__block_number(self._clock())
+        return {
+            'author': '0x' + '00' * 20,
+            'extraData': '0x',
+            'hash': '0x' + keccak(text=f'block-{number}').hex(),
+            'miner': '0x' + '00' * 20,
+            'number': number,
+            'parentHash': '0x' + keccak(text=f'block-{number - 1}').hex(),
+            'receiptsRoot': '0x' + '00' * 32,
+            'sealFields': [],
+            'sha3Uncles': '0x' + '00' * 32,
+            'signature': None,
+            'size': 0,
+            'stateRoot': '0x' + '00' * 32,
+            'step': None,
+            'timestamp': int(self._clock()),
+            'transactions': [],
+            'transactionsRoot': '0x' + '00' * 32,
+            'chainId': self.chain_id
+        }
+
+    def __block_number(self, timestamp: float) -> int:
+        return int((timestamp - self._started_at) / self.block_time)
+
+    def __decode_transaction(self, body) -> dict:
+        form = parse_qs(body.decode() if isinstance(body, bytes) else body or '')
+        if 'data' not in form:
+            raise SimulatorError(400, 'Missing signed transaction data.')
+        signed_tx_hex_string = form['data'][-1]
+        try:
+            raw = bytes.fromhex(signed_tx_hex_string[2:] if signed_tx_hex_string.startswith('0x')
+                                else signed_tx_hex_string)
+            nonce, gas_price, gas, to, value, data, v, r, s = rlp.decode(raw)
+        except Exception:
+            raise SimulatorError(400, 'Invalid signed transaction encoding.')
+
+        v = int.from_bytes(v, 'big')
+        if v < 35 or (v - 35) // 2 != self.chain_id:
+            raise SimulatorError(400, f'Transaction is not signed for chain {self.chain_id}.')
+        try:
+            sender = eth_account.Account.recover_transaction(raw)
+        except Exception:
+            raise SimulatorError(400, 'Invalid transaction signature.')
+        try:
+            function = self._functions[data[:4]]
+            args = _decode_abi(function.input_types, data[4:])
+        except Exception:
+            raise SimulatorError(400, 'Unknown contract function or invalid call data.')
+
+        contract_address = to_checksum_address(to)
+        if function.name.endswith('Batch'):
+            receiver, value = contract_address, sum(args[1])
+        else:
+            receiver, value = args[0], args[1]
+            receiver = to_checksum_address(receiver) if function.name == 'transfer' else _holder(receiver)
+
+        return {
+            'hash': '0x' + keccak(raw).hex(),
+            'nonce': int.from_bytes(nonce, 'big'),
+            'from': sender,
+            'to': receiver,
+            'value': str(value),
+            'contract': contract_address,
+            'chainId': self.chain_id,
+            'input': '0x' + data.hex(),
+            'function': function.name,
+            'args': args
+        }
+
+    def __post_transaction(self, transaction: dict) -> dict:
+        transaction['token'] = self.__token(transaction['contract'])
+        nonce = transaction['nonce']
+        sender_key = transaction['from'].lower()
+        next_nonce = self._next_nonces.get(sender_key, 0)
+        queued = self._queued.setdefault(sender_key, {})
+        if nonce < next_nonce or nonce in queued:
+            raise SimulatorError(409, f'Transaction nonce {nonce} is too low, next nonce is {next_nonce}.')
+
+        transaction['submittedAt'] = self._clock()
+        self._transactions[transaction['hash']] = transaction
+        if nonce > next_nonce:
+            queued[nonce] = transaction
+        else:
+            self.__execute(transaction)
+            while next_nonce + 1 in queued:
+                next_nonce += 1
+                self.__execute(queued.pop(next_nonce))
+        return dict(self.__transaction_json(transaction), status=True)
+
+    def __execute(self, transaction: dict):
+        sender = transaction['from'].lower()
+        self._next_nonces[sender] = transaction['nonce'] + 1
+        contract_address = transaction['contract'].lower()
+        name = transaction['function']
+        args = transaction['args']
+        if name.endswith('Batch'):
+            changes = list(zip(map(_holder, args[0]), args[1]))
+        else:
+            changes = [(_holder(args[0]), args[1])]
+
+        succeeded = True
+        if name == 'transfer':
+            (receiver, amount), = changes
+            if self._balances.get((contract_address, sender), 0) < amount:
+                succeeded = False
+            else:
+                self._balances[(contract_address, sender)] -= amount
+                self._balances[(contract_address, receiver)] = \
+                    self._balances.get((contract_address, receiver), 0) + amount
+        elif name in _CREDIT_FUNCTIONS:
+            for holder, amount in changes:
+                self._balances[(contract_address, holder)] = self._balances.get((contract_address, holder), 0) + amount
+        elif name in _DEBIT_FUNCTIONS:
+            if any(map(lambda change: self._balances.get((contract_address, change[0]), 0) < change[1], changes)):
+                succeeded = False
+            else:
+                for holder, amount in changes:
+                    self._balances[(contract_address, holder)] -= amount
+
+        transaction['status'] = succeeded
+        transaction['executedAt'] = max(self._clock(), transaction['submittedAt'])
+        transaction['transactionIndex'] = next(self._index)
+        self._history.append(transaction)
+
+    def __transaction_json(self, transaction: dict) -> dict:
+        json_tx = {key: transaction[key] for key in ('hash', 'nonce', 'from', 'to', 'value', 'contract', 'chainId',
+                                                     'input', 'token')}
+        now = self._clock()
+        confirmed_at = transaction.get('executedAt', now) + self.confirmation_delay
+        if 'executedAt' not in transaction or now < confirmed_at:
+            json_tx['state'] = 'pending'
+            return json_tx
+
+        block_number = self.__block_number(confirmed_at)
+        json_tx.update({
+            'state': 'processed',
+            'status': transaction['status'],
+            'blockNumber': block_number,
+            'blockHash': '0x' + keccak(text=f'block-{block_number}').hex(),
+            'transactionIndex': transaction['transactionIndex'],
+            'timestamp': int(confirmed_at),
+            'confirms': 1 + self.__block_number(now) - block_number
+        })
+        return json_tx
+
+
+class SimulatorAdapter(BaseAdapter):
+    """
+     requests transport adapter answering requests from a :class:`Simulator <Simulator>`.
+    """
+
+    def __init__(self, simulator: Simulator):
+        super().__init__()
+        self.simulator = simulator
+
+    def send(self, request: requests.PreparedRequest, stream=False, timeout=None, verify=True, cert=None,
+             proxies=None) -> requests.Response:
+        started_at = time.monotonic()
+        status_code, json_body = self.simulator.handle(request.method, request.url, request.headers, request.body)
+
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = json.dumps(json_body).encode()
+        response._content_consumed = True
+        response.headers['Content-Type'] = 'application/json'
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.reason = requests.status_codes._codes[status_code][0].upper()
+        response.elapsed = datetime.timedelta(seconds=time.monotonic() - started_at)
+        return response
+
+    def close(self):
+        pass
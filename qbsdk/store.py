@@ -0,0 +1,196 @@
+import json
+import logging
+import sqlite3
+from typing import Iterator
+
+import qbsdk.error as errors
+from qbsdk.api import Api, Transaction, TransactionState
+
+log = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    hash TEXT PRIMARY KEY,
+    block_number INTEGER,
+    transaction_index INTEGER,
+    timestamp INTEGER,
+    from_address TEXT,
+    to_address TEXT,
+    contract TEXT,
+    state TEXT NOT NULL,
+    json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_block_number ON transactions (block_number);
+CREATE INDEX IF NOT EXISTS transactions_from_address ON transactions (from_address);
+CREATE INDEX IF NOT EXISTS transactions_to_address ON transactions (to_address);
+CREATE INDEX IF NOT EXISTS transactions_contract ON transactions (contract);
+"""
+
+
+def _lower(address: str) -> str:
+    return address.lower() if address is not None else None
+
+
+class TransactionStore:
+    """
+     Local SQLite copy of the transactions returned by :meth:`Api.get_transactions` for one filter
+     (wallet, symbol and/or contract address). :meth:`sync` only fetches the transactions that are newer than
+     the ones retrieved by the last completed sync.
+    """
+
+    def __init__(self, api: Api, path: str = ':memory:',
+                 wallet: str = None, symbol: str = None, contract_address: str = None):
+        """
+        :param Api api: instance of API class used to sync.
+        :param str path: SQLite database file. Defaults to an in-memory database.
+        :param str wallet: (optional) only store transactions to or from that wallet address.
+        :param str symbol: (optional) only store transactions of the token with this symbol.
+        :param str contract_address: (optional) only store transactions of the token with this contract address.
+        """
+        self.api = api
+        self.wallet = wallet
+        self.symbol = symbol
+        self.contract_address = contract_address
+
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+        self.__check_scope()
+
+    def __check_scope(self):
+        scope = json.dumps({
+            'version': SCHEMA_VERSION,
+            'wallet': _lower(self.wallet),
+            'symbol': self.symbol,
+            'contractAddress': _lower(self.contract_address)
+        }, sort_keys=True)
+        stored_scope = self.__get_meta('scope')
+        if stored_scope is None:
+            with self._connection:
+                self.__set_meta('scope', scope)
+        elif stored_scope != scope:
+            raise errors.ConfigError(f'Transaction store was created for a different filter: {stored_scope}')
+
+    def sync(self, page_size: int = 100) -> int:
+        """
+        Fetch transactions newest first until the newest processed transaction of the last completed sync is
+        reached, and store them. Pending transactions found on the way are updated.
+        :param page_size: number of transactions per request.
+        :return: number of transactions stored or updated.
+        """
+        marker_hash = self.__get_meta('marker_hash')
+        marker_block = self.__get_meta('marker_block')
+        marker_block = int(marker_block) if marker_block is not None else None
+
+        new_marker = None
+        stored_count = 0
+        pages = self.api._iter_transaction_pages(self.wallet, self.symbol, self.contract_address, page_size,
+                                                 prefetch=False)
+        for page in pages:
+            reached_marker = False
+            rows = []
+            for json_tx in page:
+                processed = json_tx['state'] == TransactionState.processed.value
+                block_number = json_tx.get('blockNumber')
+                if processed and marker_hash is not None and \
+                        (json_tx['hash'] == marker_hash or
+                         (block_number is not None and marker_block is not None and block_number < marker_block)):
+                    reached_marker = True
+                    break
+                if processed and new_marker is None:
+                    new_marker = (json_tx['hash'], block_number)
+                rows.append(self.__to_row(json_tx))
+
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            stored_count += len(rows)
+            if reached_marker:
+                pages.close()
+                break
+
+        # only move the marker once everything newer than the previous one is stored,
+        # so an interrupted sync resumes from the previous marker.
+        if new_marker is not None:
+            with self._connection:
+                self.__set_meta('marker_hash', new_marker[0])
+                self.__set_meta('marker_block', str(new_marker[1]) if new_marker[1] is not None else None)
+
+        log.info(f'Synced {stored_count} transactions.')
+        return stored_count
+
+    def get(self, tx_hash: str) -> Transaction:
+        """
+        :param tx_hash: the blockchain transaction hash.
+        :return: the stored :class:`Transaction <Transaction>`, or None if it is not stored.
+        """
+        row = self._connection.execute('SELECT json FROM transactions WHERE hash = ?', (tx_hash,)).fetchone()
+        return Transaction(json.loads(row[0])) if row is not None else None
+
+    def transactions(self, wallet: str = None, contract_address: str = None,
+                     from_block: int = None, to_block: int = None) -> Iterator[Transaction]:
+        """
+        Query stored transactions, ordered descending by block.
+        :param wallet: (optional) only return transactions to or from that wallet address.
+        :param contract_address: (optional) only return transactions of the token with this contract address.
+        :param from_block: (optional) lowest block number to include.
+        :param to_block: (optional) highest block number to include.
+        :return: Iterator[Transaction]
+        """
+        conditions = []
+        params = []
+        if wallet is not None:
+            conditions.append('(from_address = ? OR to_address = ?)')
+            params += [_lower(wallet), _lower(wallet)]
+        if contract_address is not None:
+            conditions.append('contract = ?')
+            params.append(_lower(contract_address))
+        if from_block is not None:
+            conditions.append('block_number >= ?')
+            params.append(from_block)
+        if to_block is not None:
+            conditions.append('block_number <= ?')
+            params.append(to_block)
+
+        where = f'WHERE {" AND ".join(conditions)}' if len(conditions) > 0 else ''
+        cursor = self._connection.execute(
+            f'SELECT json FROM transactions {where} '
+            f'ORDER BY block_number IS NULL DESC, block_number DESC, transaction_index DESC', params)
+        return map(lambda row: Transaction(json.loads(row[0])), cursor)
+
+    def count(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def __to_row(json_tx: dict) -> tuple:
+        return (json_tx['hash'],
+                json_tx.get('blockNumber'),
+                json_tx.get('transactionIndex'),
+                json_tx.get('timestamp'),
+                _lower(json_tx.get('from')),
+                _lower(json_tx.get('to')),
+                _lower(json_tx['contract'] if 'contract' in json_tx else json_tx.get('contractAddress')),
+                json_tx['state'],
+                json.dumps(json_tx))
+
+    def __get_meta(self, key: str) -> str:
+        row = self._connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def __set_meta(self, key: str, value: str):
+        self._connection.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, value))
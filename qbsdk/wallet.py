@@ -5,16 +5,28 @@ from eth_keys import keys
 import eth_keys
 from eth_utils import decode_hex
 import logging
-import qbsdk.loyalty_token as loyalty_token
 import qbsdk.error as errors
 from qbsdk.api import Token
 from qbsdk.api import Transaction
 from qbsdk.api import Api
 from qbsdk.api import TokenType
 from qbsdk.api import TransactionType
-from typing import Callable, List
+from qbsdk.nonce import NonceManager
+from qbsdk.builder import TransactionBuilder, BatchGasProfile, NOWALLET_BATCH_FUNCTIONS
+from qbsdk.builder import DEFAULT_GAS, DEFAULT_BATCH_GAS_PROFILES
+import qbsdk.bulk as bulk
+from qbsdk.metrics import SendStatistics, SendTimings
+from qbsdk.registry import ContractRegistry, SharedContract
+from qbsdk.signing import TransactionSigner
+from typing import Callable, Dict, List, Tuple
 from enum import Enum
 import eth_account
+import heapq
+import requests
+import threading
+import urllib3
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 log = logging.getLogger(__name__)
 
@@ -40,11 +52,42 @@ class BrandRetryConfig:
 DEFAULT_BRAND_RETRY_CONFIG = BrandRetryConfig(backoff.constant, backoff.full_jitter, 2, 10)
 
 
+DEFAULT_PIPELINE_WINDOW = 8
+
+
+def _record_backoff(details: dict):
+    timings = details['kwargs']['timings']
+    timings.conflict_retries += 1
+    timings.backoff += details['wait']
+
 class TxData:
     def __init__(self, amount: int, address: str):
         self.amount = amount
         self.address = address
 
+
+class SendResult:
+    """
+     Outcome of one item sent through a pipeline. Exactly one of `transaction` and `error` is set.
+    """
+    def __init__(self, tx_data: TxData, transaction: Transaction = None, error: Exception = None):
+        self.tx_data = tx_data
+        self.transaction = transaction
+        self.error = error
+
+
+class BatchResult:
+    """
+     Outcome of one chunk sent by :meth:`Wallet.send_batches <Wallet.send_batches>`. `offset` is the index of the
+     chunk's first item in the input list. Exactly one of `transaction` and `error` is set.
+    """
+    def __init__(self, tx_data_list: List[TxData], offset: int, transaction: Transaction = None,
+                 error: Exception = None):
+        self.tx_data_list = tx_data_list
+        self.offset = offset
+        self.transaction = transaction
+        self.error = error
+
 class Wallet:
     private_key: str
     checksum_address: str
@@ -52,19 +95,32 @@ class Wallet:
     token: Token
     api: Api
     __loyalty_contract: web3.contract.Contract
+    __transaction_builder: TransactionBuilder
+    __signer: TransactionSigner
     _chain_id: int
     _transfer_strategy: TransferStrategy
+    _nonce_manager: NonceManager
+    send_statistics: SendStatistics
+    send_hook: Callable[[SendTimings], None]
     brand_retry_config: BrandRetryConfig = DEFAULT_BRAND_RETRY_CONFIG
+    batch_gas_profiles: Dict[TransactionType, BatchGasProfile] = DEFAULT_BATCH_GAS_PROFILES
     def __init__(self,
                  private_key: str,
                  token_symbol: str,
                  api: Api,
-                 transfer_strategy: TransferStrategy = TransferStrategy.user):
+                 transfer_strategy: TransferStrategy = TransferStrategy.user,
+                 local_nonces: bool = True,
+                 send_hook: Callable[[SendTimings], None] = None):
         """
         :param str private_key: Ethereum address private key
         :param str token_symbol: Token symbol
         :param Api api: instance of API class to connect to the blockchain.
         :param TransferStrategy transfer_strategy: Can either be `brand` or `user`. Defaults to `user`.
+        :param bool local_nonces: only used by the `brand` strategy. If True, the next nonce is fetched once and
+         then allocated locally, and only refetched after a conflict or a failed send. If False, it is fetched
+         before every transaction. Defaults to True.
+        :param send_hook: (optional) called with the :class:`SendTimings <qbsdk.metrics.SendTimings>` of every
+         send_transaction and send_batch call, on the sending thread, after `send_statistics` was updated.
         """
         self.private_key = private_key
         self._transfer_strategy = transfer_strategy
@@ -74,6 +130,11 @@ class Wallet:
         self._chain_id: int = None
         self.web3_connection: Web3 = None
         self.__loyalty_contract = None
+        self.__transaction_builder = None
+        self.__signer = None
+        self._nonce_manager = None
+        self.send_statistics = SendStatistics()
+        self.send_hook = send_hook
 
         if api is not None and api.api_key is None and transfer_strategy == TransferStrategy.brand:
             raise errors.ConfigError('API instance requires an api_key if employing a brand TransferStrategy')
@@ -83,10 +144,14 @@ class Wallet:
             priv_key = keys.PrivateKey(priv_key_bytes)
             pub_key = priv_key.public_key
             self.brand_address_public_key = pub_key
+            self.__signer = TransactionSigner(priv_key)
             self.checksum_address = self.brand_address_public_key.to_checksum_address()
         except eth_keys.exceptions.ValidationError as e:
             raise errors.ConfigError(f'Invalid brand private key: {str(e)}')
 
+        if transfer_strategy == TransferStrategy.brand and local_nonces:
+            self._nonce_manager = NonceManager(lambda: self.api._get_address_next_nonce(self.checksum_address))
+
     @classmethod
     def create_random(cls,
                       token_symbol: str,
@@ -104,12 +169,15 @@ class Wallet:
         return cls(new_eth_account.key.hex(), token_symbol, api, transfer_strategy)
 
 
-    def setup(self, token: Token = None, chain_id: str = None):
+    def setup(self, token: Token = None, chain_id: str = None, registry: ContractRegistry = None):
         """
         Call this method before making calls to send_transaction to enable sending. if token and chain_id are
         specified no I/O is done. If they are not, they are fetched from the API.
         :param Token token: nullable. If not defined it is fetched from the API based on symbol.
         :param str chain_id: nullable. If not defined it is fetched from API.
+        :param ContractRegistry registry: (optional) registry sharing the fetched token and chain id, and the web3
+         contract, with other wallets set up with it, e.g. `qbsdk.registry.default_registry`. Only the first
+         wallet of an API host and contract then does I/O.
         :return: None
         """
         if self.api is None:
@@ -119,7 +187,10 @@ class Wallet:
 
         if token is None:
             log.debug(f'Token uninitialized for {self.checksum_address}. fetching..')
-            token = self.__get_token(self.token_symbol)
+            if registry is not None:
+                token = registry.get_token(self.api, self.token_symbol)
+            else:
+                token = self.__get_token(self.token_symbol)
             if token is None:
                 raise errors.ConfigError(f'Token with symbol {self.token_symbol} does not exist.')
         self.token = token
@@ -128,31 +199,27 @@ class Wallet:
 
         if chain_id is None:
             log.debug(f'Chain id uninitialized for {self.checksum_address}. fetching..')
-            last_block = self.api.get_last_block()
-            chain_id = last_block.chain_id
+            if registry is not None:
+                chain_id = registry.get_chain_id(self.api)
+            else:
+                chain_id = self.api._get_chain_id()
         self._chain_id = chain_id
 
         logging.info(f'Setting up web3 contract with contract address {token.contract_address}')
 
-        self.web3_connection = Web3()
-        checksummed_contract_address = Web3.toChecksumAddress(token.contract_address)
-
-        if token.token_type == TokenType.wallet:
-            self.__loyalty_contract = self.web3_connection.eth.contract(
-                abi=loyalty_token.abi,
-                address=checksummed_contract_address)
-        elif token.token_type == TokenType.nowallet:
-            self.__loyalty_contract = self.web3_connection.eth.contract(
-                abi=loyalty_token.no_wallet_abi,
-                address=checksummed_contract_address)
+        if registry is not None:
+            shared_contract = registry.get_contract(token, chain_id)
         else:
-            raise errors.ConfigError(f'Unsupported token type: {token.token_type}')
+            shared_contract = SharedContract(token.token_type, token.contract_address, chain_id)
+        self.web3_connection = shared_contract.web3_connection
+        self.__loyalty_contract = shared_contract.contract
+        self.__transaction_builder = shared_contract.transaction_builder
 
 
 
     def __get_token(self, symbol: str) -> Token:
-        tokens = self.api.get_tokens(wallet_address=self.checksum_address)
-        matches = list(filter(lambda token: token.symbol == symbol, tokens.private))
+        tokens = self.api._get_private_tokens(wallet_address=self.checksum_address)
+        matches = list(filter(lambda token: token.symbol == symbol, tokens))
         if len(matches) == 0:
             return None
         else:
@@ -168,83 +235,106 @@ class Wallet:
         if self.__loyalty_contract is None or self.web3_connection is None:
             raise errors.ConfigError('Call .setup() method first in order to be able to use this method.')
 
+        return self.__timed_send('send_transaction',
+                                 lambda timings: self.__send_single_transaction(to, value, nonce, tx_type, timings))
+
+
+    def __send_single_transaction(self, to: str, value: int, nonce, tx_type: TransactionType,
+                                  timings: SendTimings) -> Transaction:
         if nonce is not None:
-            return self.__send_transaction(to, value, nonce)
+            return self.__send_transaction(to, value, nonce, timings)
 
         if self._transfer_strategy is TransferStrategy.user:
             checksummed_contract_address = Web3.toChecksumAddress(self.token.contract_address)
-            raw_tx = self.api.get_raw_transaction(self.checksum_address, to, value,
-                                                  checksummed_contract_address, tx_type)
+            raw_tx = timings.time('raw_transaction', self.api.get_raw_transaction, self.checksum_address, to, value,
+                                  checksummed_contract_address, tx_type)
             raw_tx['gas'] = raw_tx['gasLimit']
             del raw_tx['gasLimit']
-            return self.__send_web3_transaction(raw_tx)
+            return self.__send_web3_transaction(raw_tx, timings)
         elif self._transfer_strategy is TransferStrategy.brand:
 
             if self.token.token_type == TokenType.wallet:
                 def send(nonce: int):
-                   self. __send_transaction(to, value, nonce)
-                return self.__send_retryable_transaction(send)
+                    return self.__send_transaction(to, value, nonce, timings)
+                return self.__send_retryable_transaction(send, timings=timings)
             else:
                 def send(nonce: int):
-                   self.__send_nowallet_transaction(to, value, tx_type, nonce)
-                return self.__send_retryable_transaction(send)
+                    return self.__send_nowallet_transaction(to, value, tx_type, nonce, timings)
+                return self.__send_retryable_transaction(send, timings=timings)
 
         else:
             raise ValueError('Unsupported transfer strategy.')
 
 
+    def __timed_send(self, operation: str, send: Callable[[SendTimings], Transaction]) -> Transaction:
+        timings = SendTimings(operation)
+        started = time.perf_counter()
+        try:
+            return send(timings)
+        except Exception:
+            timings.failed = True
+            raise
+        finally:
+            timings.total = time.perf_counter() - started
+            self.send_statistics.add(timings)
+            if self.send_hook is not None:
+                try:
+                    self.send_hook(timings)
+                except Exception:
+                    log.exception('Send hook failed')
+
+
     @backoff.on_exception(backoff.constant,
                           errors.ConflictError,
                           jitter=backoff.full_jitter,
                           interval=2,
-                          max_tries=10)
-    def __send_retryable_transaction(self, send: Callable[[int], None]) -> Transaction:
-        nonce = self.api._get_address_next_nonce(self.checksum_address)
-        send(nonce)
+                          max_tries=10,
+                          on_backoff=_record_backoff)
+    def __send_retryable_transaction(self, send: Callable[[int], Transaction], timings: SendTimings) -> Transaction:
+        if self._nonce_manager is None:
+            return send(timings.time('nonce', self.api._get_address_next_nonce, self.checksum_address))
+
+        nonce = timings.time('nonce', self._nonce_manager.allocate)
+        try:
+            return send(nonce)
+        except Exception:
+            # the nonce was not consumed (conflict) or may have left a gap (failed send),
+            # either way the local counter is no longer trustworthy.
+            self._nonce_manager.resync()
+            raise
 
 
-    def __send_transaction(self, to: str, value: int, nonce) -> Transaction:
+    def __send_transaction(self, to: str, value: int, nonce, timings: SendTimings) -> Transaction:
         log.info(f'Executing transaction to: {to}, value: {value} nonce: {nonce} on chain with id ${self._chain_id}')
+        return self.__send_web3_transaction(timings.time('build', self.__build_transaction, to, value, nonce), timings)
 
-        checksummed_to_address = Web3.toChecksumAddress(to)
-        tx = self.__loyalty_contract.functions.transfer(checksummed_to_address, value).buildTransaction({
-            'nonce': nonce,
-            'gasPrice': 0,
-            'gas': 1000000,
-            'value': 0,
-            'chainId': self._chain_id
-        })
-        return self.__send_web3_transaction(tx)
-
-    def __send_nowallet_transaction(self, to: str, value: int, tx_type: TransactionType, nonce) -> Transaction:
+    def __send_nowallet_transaction(self, to: str, value: int, tx_type: TransactionType, nonce,
+                                    timings: SendTimings) -> Transaction:
         log.info(f'Executing transaction to: {to}, value: {value} nonce: {nonce} on chain with id ${self._chain_id}')
+        raw_tx = timings.time('build', self.__build_nowallet_transaction, to, value, tx_type, nonce)
+        return self.__send_web3_transaction(raw_tx, timings)
 
-        tx_params = {
-                'nonce': nonce,
-                'gasPrice': 0,
-                'gas': 1000000,
-                'value': 0,
-                'chainId': self._chain_id
-            }
 
-        if tx_type == TransactionType.earn:
-            tx = self.__loyalty_contract.functions.earn(to, value).buildTransaction(tx_params)
-        elif tx_type == TransactionType.debit:
-            tx = self.__loyalty_contract.functions.debit(to, value).buildTransaction(tx_params)
-        elif tx_type == TransactionType.redeem:
-            tx = self.__loyalty_contract.functions.redeem(to, value).buildTransaction(tx_params)
+    def __build_transaction(self, to: str, value: int, nonce: int) -> dict:
+        return self.__transaction_builder.build(to, value, nonce)
 
-        return self.__send_web3_transaction(tx)
+    def __build_nowallet_transaction(self, to: str, value: int, tx_type: TransactionType, nonce: int) -> dict:
+        return self.__transaction_builder.build(to, value, nonce, tx_type)
 
 
-    def __send_web3_transaction(self, raw_tx: dict) -> Transaction:
-        signed_tx = self.web3_connection.eth.account.signTransaction(raw_tx, self.private_key)
-        signed_tx_hex_string = signed_tx.rawTransaction.hex()
+    def __sign_transaction(self, raw_tx: dict) -> str:
+        return self.__signer.sign(raw_tx)
 
-        return self.api.post_transaction(signed_tx_hex_string)
+    def __send_web3_transaction(self, raw_tx: dict, timings: SendTimings) -> Transaction:
+        signed_tx_hex_string = timings.time('sign', self.__sign_transaction, raw_tx)
+        return timings.time('post', self.api.post_transaction, signed_tx_hex_string)
 
 
     def send_batch(self, tx_data_list: [TxData], tx_type: TransactionType) -> Transaction:
+        return self.__timed_send('send_batch', lambda timings: self.__send_batch(tx_data_list, tx_type, timings))
+
+
+    def __send_batch(self, tx_data_list: List[TxData], tx_type: TransactionType, timings: SendTimings) -> Transaction:
         if self.token.token_type != TokenType.nowallet:
             raise errors.UnsupportedOperationError(f'The token type does not support sending batches.')
 
@@ -252,34 +342,288 @@ class Wallet:
         to_array: List[str] = list(map(lambda tx_data: tx_data.address, tx_data_list))
         amount_array: List[int] = list(map(lambda tx_data: tx_data.amount, tx_data_list))
 
+        if tx_type not in NOWALLET_BATCH_FUNCTIONS:
+            raise errors.UnsupportedOperationError(f'TransactionType {tx_type} not supported for batches.')
+
         def send(nonce):
-            tx_params = {
-                    'nonce': nonce,
-                    'gasPrice': 0,
-                    'gas': 1000000,
-                    'value': 0,
-                    'chainId': self._chain_id
-                }
-            if  tx_type == TransactionType.earn:
-                tx = self.__loyalty_contract.functions.earnBatch(to_array, amount_array).buildTransaction(tx_params)
-            elif tx_type == TransactionType.debit:
-                tx = self.__loyalty_contract.functions.debitBatch(to_array, amount_array).buildTransaction(tx_params)
-            elif tx_type == TransactionType.redeem:
-                tx = self.__loyalty_contract.functions.redeemBatch(to_array, amount_array).buildTransaction(tx_params)
-            else:
-                raise errors.UnsupportedOperationError(f'TransactionType {tx_type.value} not supported for batches.')
-            return self.__send_web3_transaction(tx)
+            tx = timings.time('build', self.__transaction_builder.build_batch, to_array, amount_array, tx_type, nonce)
+            return self.__send_web3_transaction(tx, timings)
 
         if self._transfer_strategy is TransferStrategy.user:
 
             checksummed_contract_address = Web3.toChecksumAddress(self.token.contract_address)
             # fetch a raw_tx simply to be able to get a nonce value
-            raw_tx = self.api.get_raw_transaction(self.checksum_address, to_array[0], amount_array[0], checksummed_contract_address, tx_type)
+            raw_tx = timings.time('raw_transaction', self.api.get_raw_transaction, self.checksum_address,
+                                  to_array[0], amount_array[0], checksummed_contract_address, tx_type)
             return send(raw_tx['nonce'])
         elif self._transfer_strategy is TransferStrategy.brand:
-            return self.__send_retryable_transaction(send)
+            return self.__send_retryable_transaction(send, timings=timings)
+
+
+    def send_batches(self, tx_data_list: List[TxData], tx_type: TransactionType, gas_limit: int = DEFAULT_GAS,
+                     window: int = DEFAULT_PIPELINE_WINDOW) -> List[BatchResult]:
+        """
+        Send any number of items as batch calls. The list is split into chunks as large as the gas profile of the
+        batch function (`batch_gas_profiles`) allows within `gas_limit`, and the chunks are sent with consecutive
+        nonces through the same pipeline as :meth:`send_pipelined`.
+        Only available for the `brand` TransferStrategy and nowallet tokens.
+        :param tx_data_list: receivers and amounts.
+        :param tx_type: earn, debit or redeem.
+        :param gas_limit: gas limit of every batch transaction.
+        :param window: maximum number of batch transactions posted but not yet acknowledged by the API.
+        :return: a :class:`BatchResult <BatchResult>` per chunk, in input order. Chunks with an `error` were not sent.
+        """
+        if self.__transaction_builder is None:
+            raise errors.ConfigError('Call .setup() method first in order to be able to use this method.')
+        if self.token.token_type != TokenType.nowallet:
+            raise errors.UnsupportedOperationError('The token type does not support sending batches.')
+        if tx_type not in NOWALLET_BATCH_FUNCTIONS:
+            raise errors.UnsupportedOperationError(f'TransactionType {tx_type} not supported for batches.')
+        if self._transfer_strategy is not TransferStrategy.brand:
+            raise errors.UnsupportedOperationError('Pipelined sending requires the brand TransferStrategy.')
 
+        chunk_size = self.batch_gas_profiles[tx_type].max_items(gas_limit)
+        if chunk_size < 1:
+            raise errors.ConfigError(f'Gas limit {gas_limit} is too low for a {tx_type.value} batch.')
 
+        chunks = [(offset, tx_data_list[offset:offset + chunk_size])
+                  for offset in range(0, len(tx_data_list), chunk_size)]
 
+        def builder(chunk: List[TxData]) -> Callable[[int], dict]:
+            to_array = list(map(lambda tx_data: tx_data.address, chunk))
+            amount_array = list(map(lambda tx_data: tx_data.amount, chunk))
+            return lambda nonce: self.__transaction_builder.build_batch(to_array, amount_array, tx_type, nonce,
+                                                                        gas=gas_limit)
 
+        log.info(f'Sending {len(tx_data_list)} {tx_type.value} items in {len(chunks)} batches of up to {chunk_size}')
+        outcomes = self._send_pipelined(list(map(lambda chunk: builder(chunk[1]), chunks)), window)
+        return [BatchResult(chunk, offset, transaction, error)
+                for (offset, chunk), (transaction, error) in zip(chunks, outcomes)]
 
+
+    def send_pipelined(self, tx_data_list: List[TxData], tx_type: TransactionType = None,
+                       window: int = DEFAULT_PIPELINE_WINDOW) -> List[SendResult]:
+        """
+        Send one transaction per item with consecutive nonces, keeping up to `window` of them in flight at once.
+        Nonces are assigned in list order. If a send fails, no further transactions are dispatched in that round;
+        once the in-flight ones settle, every item from the first failure onwards that was not accepted is sent
+        again (up to `brand_retry_config.max_tries` rounds). Transactions that may have been accepted (timeouts,
+        server errors) are resent unchanged, with the same nonce, so that no item is executed twice. Only items
+        rejected with a nonce conflict are signed again with a new nonce. The nonce of a transaction rejected
+        otherwise is reused for the next item signed; if no item is left to fill it, the accepted items with higher
+        nonces fail with a :class:`NonceGapError <qbsdk.error.NonceGapError>`.
+        Only available for the `brand` TransferStrategy.
+        :param tx_data_list: receivers and amounts, in the order they should be sent.
+        :param tx_type: transaction type. Required for nowallet tokens.
+        :param window: maximum number of transactions posted but not yet acknowledged by the API.
+        :return: a :class:`SendResult <SendResult>` per item, in input order.
+        """
+        if self.__loyalty_contract is None or self.web3_connection is None:
+            raise errors.ConfigError('Call .setup() method first in order to be able to use this method.')
+        if self._transfer_strategy is not TransferStrategy.brand:
+            raise errors.UnsupportedOperationError('Pipelined sending requires the brand TransferStrategy.')
+
+        if self.token.token_type == TokenType.wallet:
+            def build(tx_data: TxData, nonce: int) -> dict:
+                return self.__build_transaction(tx_data.address, tx_data.amount, nonce)
+        else:
+            def build(tx_data: TxData, nonce: int) -> dict:
+                return self.__build_nowallet_transaction(tx_data.address, tx_data.amount, tx_type, nonce)
+
+        builders = list(map(lambda tx_data: (lambda nonce: build(tx_data, nonce)), tx_data_list))
+        outcomes = self._send_pipelined(builders, window)
+        return [SendResult(tx_data, transaction, error)
+                for tx_data, (transaction, error) in zip(tx_data_list, outcomes)]
+
+
+    def sign_bulk(self, items: List[Tuple[str, int, TransactionType]], start_nonce: int, processes: int = None,
+                  chunk_size: int = bulk.DEFAULT_CHUNK_SIZE) -> List[str]:
+        """
+        Build and sign one transaction per item with consecutive nonces, in parallel across a process pool.
+        Transactions are built exactly like :meth:`send_transaction` builds them for the `brand` strategy.
+        Nothing is sent; post the results in order with :meth:`Api.post_transaction <Api.post_transaction>`.
+        :param items: (to, value, tx_type) per transaction. tx_type is ignored for wallet tokens.
+        :param int start_nonce: nonce of the first transaction, the i-th item is signed with `start_nonce + i`.
+        :param int processes: (optional) number of worker processes, defaults to the number of CPUs.
+        :param int chunk_size: number of consecutive transactions a worker signs per task.
+        :return: the 0x prefixed hex encoded signed transactions, in input order.
+        """
+        if self.__transaction_builder is None:
+            raise errors.ConfigError('Call .setup() method first in order to be able to use this method.')
+        return bulk.sign_transactions(self.private_key, self.__transaction_builder, items, start_nonce,
+                                      processes=processes, chunk_size=chunk_size)
+
+
+    def _send_pipelined(self, builders: List[Callable[[int], dict]], window: int) -> List[tuple]:
+        nonce_manager = self._nonce_manager
+        if nonce_manager is None:
+            nonce_manager = NonceManager(lambda: self.api._get_address_next_nonce(self.checksum_address))
+
+        outcomes = [(None, None)] * len(builders)
+        slots = [_PipelineSlot() for _ in builders]
+        # nonces of transactions that were rejected or never posted, given to the next items signed
+        free_nonces: List[int] = []
+        pending = list(range(len(builders)))
+        retry_config = self.brand_retry_config
+
+        for attempt in range(retry_config.max_tries):
+            if attempt > 0:
+                time.sleep(retry_config.jitter(retry_config.interval))
+
+            retryable = self.__send_pipeline_round(builders, pending, window, nonce_manager, slots, free_nonces,
+                                                   outcomes)
+            if len(retryable) == 0:
+                break
+            log.info(f'Pipeline round {attempt + 1} stopped at item {retryable[0]}, '
+                     f'{len(retryable)} item(s) left to resend.')
+            pending = retryable
+        else:
+            for index in pending:
+                if outcomes[index][1] is None:
+                    outcomes[index] = (None, errors.QiibeeError(
+                        f'Not sent after {retry_config.max_tries} pipeline rounds.'))
+
+        if len(free_nonces) > 0:
+            # accepted transactions with higher nonces stay queued until the lowest unused nonce is used
+            gap = min(free_nonces)
+            for index, (transaction, error) in enumerate(outcomes):
+                if transaction is not None and slots[index].nonce > gap:
+                    outcomes[index] = (None, errors.NonceGapError(
+                        f'Transaction {transaction.hash} with nonce {slots[index].nonce} is queued behind unused '
+                        f'nonce {gap}. It is executed as soon as a transaction with that nonce is sent.'))
+        if any(map(lambda outcome: outcome[1] is not None, outcomes)):
+            nonce_manager.resync()
+        return outcomes
+
+
+    def __send_pipeline_round(self, builders: List[Callable[[int], dict]], pending: List[int], window: int,
+                              nonce_manager: NonceManager, slots: List['_PipelineSlot'], free_nonces: List[int],
+                              outcomes: List[tuple]) -> List[int]:
+        """
+        Sends the pending items in order and records their outcomes. Items whose signed transaction may have been
+        accepted are resent unchanged, only items whose transaction was certainly not accepted are signed again.
+        :return: indexes of the items to send again, in order.
+        """
+        in_flight = threading.BoundedSemaphore(window)
+        failed = threading.Event()
+        futures = {}
+        unsigned = None
+
+        def on_done(future):
+            if future.exception() is not None:
+                failed.set()
+            in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=window) as executor:
+            for index in pending:
+                in_flight.acquire()
+                if failed.is_set():
+                    in_flight.release()
+                    break
+                slot = slots[index]
+                if slot.signed_tx is None:
+                    nonce = heapq.heappop(free_nonces) if len(free_nonces) > 0 else nonce_manager.allocate()
+                    try:
+                        slot.signed_tx = self.__sign_transaction(builders[index](nonce))
+                        slot.nonce = nonce
+                    except Exception as e:
+                        heapq.heappush(free_nonces, nonce)
+                        in_flight.release()
+                        outcomes[index] = (None, e)
+                        unsigned = index
+                        failed.set()
+                        break
+                future = executor.submit(self.api.post_transaction, slot.signed_tx)
+                future.add_done_callback(on_done)
+                futures[index] = future
+
+        if not failed.is_set():
+            for index, future in futures.items():
+                outcomes[index] = (future.result(), None)
+            return []
+
+        retryable = []
+        conflicted = False
+        for index in pending:
+            future = futures.get(index)
+            if future is None:
+                if index != unsigned:
+                    retryable.append(index)
+                continue
+
+            slot = slots[index]
+            error = future.exception()
+            if error is None:
+                outcomes[index] = (future.result(), None)
+                continue
+            outcomes[index] = (None, error)
+
+            if slot.in_doubt and (isinstance(error, errors.ConflictError) or self.__was_rejected(error)):
+                # the transaction was posted before without a definite answer, and may have been accepted then
+                try:
+                    transaction = self.__find_transaction(slot.signed_tx)
+                except Exception as e:
+                    log.info(f'Could not look up transaction of item {index}: {e}')
+                    retryable.append(index)
+                    continue
+                if transaction is not None:
+                    outcomes[index] = (transaction, None)
+                    continue
+                slot.in_doubt = False
+
+            if isinstance(error, errors.ConflictError):
+                # the nonce was used by another transaction, this one can only be sent with a new nonce
+                conflicted = True
+                slot.signed_tx = None
+                retryable.append(index)
+            elif self.__was_rejected(error):
+                heapq.heappush(free_nonces, slot.nonce)
+                slot.signed_tx = None
+            else:
+                if not self.__was_not_sent(error):
+                    slot.in_doubt = True
+                retryable.append(index)
+
+        if conflicted and len(free_nonces) == 0 and not any(map(lambda slot: slot.in_doubt, slots)):
+            # the locally allocated nonces fell behind transactions sent by others, and none of ours is pending
+            nonce_manager.resync()
+        return retryable
+
+
+    def __find_transaction(self, signed_tx_hex_string: str) -> Transaction:
+        tx_hash = '0x' + bytes(Web3.keccak(hexstr=signed_tx_hex_string)).hex()
+        try:
+            return self.api.get_transaction(tx_hash)
+        except errors.NotFoundError:
+            return None
+
+
+    @staticmethod
+    def __was_rejected(error: Exception) -> bool:
+        # a client error other than a nonce conflict, the API did not accept the transaction
+        if isinstance(error, (errors.InvalidRequestError, errors.AuthorizationError, errors.NotFoundError)):
+            return True
+        return isinstance(error, requests.exceptions.HTTPError) and error.response is not None \
+            and 400 <= error.response.status_code < 500
+
+
+    @staticmethod
+    def __was_not_sent(error: Exception) -> bool:
+        # no connection could be established, the request never reached the API
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if not isinstance(error, requests.exceptions.ConnectionError) or len(error.args) == 0:
+            return False
+        return isinstance(getattr(error.args[0], 'reason', None), urllib3.exceptions.NewConnectionError)
+
+
+class _PipelineSlot:
+    """
+     State of one item of a pipeline across rounds: its last signed transaction and that transaction's nonce.
+    """
+    def __init__(self):
+        self.nonce: int = None
+        # None if the item has to be signed (again) with a new nonce
+        self.signed_tx: str = None
+        # True if signed_tx was posted without a definite answer: it is then only ever resent unchanged
+        self.in_doubt = False
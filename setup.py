@@ -15,17 +15,22 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/qiibee/qb-sdk-python",
     packages=setuptools.find_packages(),
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     install_requires=[
         'requests>=1.0.0',
         'web3>=5.0.0',
         'eth-utils>=1.6.0,<2.0.0',
         'eth-keys>=0.2.1,<0.3.0',
-        'backoff>=1.9.0,<2.0.0'
+        'backoff>=1.9.0,<2.0.0',
+        'rlp>=1.1.0'
     ],
+    extras_require={
+        'columnar': ['numpy>=1.16.0', 'pandas>=1.0.0'],
+        'opentelemetry': ['opentelemetry-api>=1.0.0']
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],